@@ -0,0 +1,82 @@
+"""
+Persistence benchmark for the to-do list: journaled mutations vs rewriting
+the whole JSON file on every change.
+
+For each list size a snapshot is written directly, then it times loading it,
+the average cost of a journaled mutation (add / complete / edit mix,
+including the occasional compaction) and the cost of one full save_tasks
+rewrite, which is what every mutation used to pay.
+
+Usage: python bench_journal.py [--sizes 10000 100000 1000000] [--ops 2000]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from todo import TodoList
+
+
+def write_snapshot(filename, size):
+    tasks = [{
+        'id': i,
+        'description': f"Task {i}",
+        'category': ("Work", "Personal", "Shopping", "Health")[i % 4],
+        'priority': ("High", "Medium", "Low")[i % 3],
+        'completed': i % 5 == 0,
+        'created_at': "2024-01-01T00:00:00",
+        'due_date': "2024-06-01T00:00:00" if i % 2 else None
+    } for i in range(1, size + 1)]
+    with open(filename, 'w') as file:
+        json.dump({'tasks': tasks, 'next_id': size + 1, 'seq': 0}, file, indent=2)
+
+
+def run(size, ops, directory):
+    filename = os.path.join(directory, f"todo_{size}.json")
+    write_snapshot(filename, size)
+
+    start = time.perf_counter()
+    todo = TodoList(filename)
+    load = time.perf_counter() - start
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for i in range(ops):
+            kind = i % 3
+            if kind == 0:
+                todo.add_task(f"Bench {i}", "Work", "High")
+            elif kind == 1:
+                todo.mark_completed(i % size + 1)
+            else:
+                todo.edit_task(i % size + 1, new_description=f"Edited {i}")
+        journaled = (time.perf_counter() - start) / ops
+        todo.close()
+
+        rewrites = max(1, min(5, 200000 // size))
+        start = time.perf_counter()
+        for _ in range(rewrites):
+            todo.save_tasks()
+        rewrite = (time.perf_counter() - start) / rewrites
+
+    todo.close()
+    return load, journaled, rewrite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Journal vs full-rewrite persistence benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--ops', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'Tasks':>9} {'load s':>8} {'journal ms/op':>14} {'rewrite ms/op':>14} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            load, journaled, rewrite = run(size, args.ops, directory)
+            print(f"{size:>9} {load:>8.2f} {journaled * 1000:>14.3f} {rewrite * 1000:>14.1f} {rewrite / journaled:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
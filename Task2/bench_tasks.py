@@ -0,0 +1,92 @@
+"""
+Memory and render benchmark for the slotted Task record.
+
+Builds N tasks both as the plain dicts the list used to hold (due dates
+already parsed) and as Task objects, and reports traced memory per task for
+each. It then loads an N-task todo_data.json and times view_tasks and
+get_statistics with output discarded.
+
+Usage: python bench_tasks.py [--tasks 100000] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from todo import Task, TodoList
+
+
+def task_data(count):
+    return [{
+        'id': i,
+        'description': f"Task {i}",
+        'category': ("Work", "Personal", "Shopping", "Health")[i % 4],
+        'priority': ("High", "Medium", "Low")[i % 3],
+        'completed': i % 5 == 0,
+        'created_at': "2024-01-01T00:00:00",
+        'due_date': "2024-06-01T00:00:00" if i % 2 else None
+    } for i in range(1, count + 1)]
+
+
+def traced_per_item(build, count):
+    tracemalloc.start()
+    items = build()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return used / count
+
+
+def as_dicts(data):
+    tasks = []
+    for item in data:
+        task = dict(item)
+        if task['due_date']:
+            task['due_date'] = Task.parse_date(task['due_date'])
+        tasks.append(task)
+    return tasks
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task record memory/render benchmark")
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    data = task_data(args.tasks)
+    dict_bytes = traced_per_item(lambda: as_dicts(data), args.tasks)
+    task_bytes = traced_per_item(lambda: [Task.from_dict(item) for item in data], args.tasks)
+    print(f"memory per task: dict {dict_bytes:.0f} B, Task {task_bytes:.0f} B "
+          f"({(1 - task_bytes / dict_bytes) * 100:.0f}% less)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "todo_data.json")
+        with open(filename, 'w') as file:
+            json.dump({'tasks': data, 'next_id': args.tasks + 1}, file)
+
+        start = time.perf_counter()
+        todo = TodoList(filename)
+        print(f"load:            {time.perf_counter() - start:.3f} s")
+        with contextlib.redirect_stdout(io.StringIO()):
+            view = best_of(args.repeat, todo.view_tasks)
+            stats = best_of(args.repeat, todo.get_statistics)
+        todo.close()
+    print(f"view_tasks:      {view:.3f} s")
+    print(f"get_statistics:  {stats:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
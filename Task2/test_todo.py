@@ -0,0 +1,147 @@
+"""
+Tests for the JSON backend's journal: recovery from crashes and batches,
+lists sharing one file seeing each other's changes before they write, and
+list lifetimes.
+
+Run with: python -m unittest test_todo  (from Task2/)
+"""
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import unittest
+import weakref
+
+from todo import TodoList
+
+
+class TodoListTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "todo_data.json")
+        self.lists = []
+
+    def tearDown(self):
+        for todo_list in self.lists:
+            todo_list.close()
+        self.directory.cleanup()
+
+    def open_list(self):
+        todo_list = TodoList(self.filename)
+        self.lists.append(todo_list)
+        return todo_list
+
+    def add(self, todo_list, *descriptions):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for description in descriptions:
+                todo_list.add_task(description)
+
+    def quietly(self, method, *args):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            result = method(*args)
+        return result, output.getvalue()
+
+
+class JournalRecoveryTest(TodoListTestCase):
+
+    def append_to_journal(self, data):
+        with open(self.filename + ".journal", 'ab') as journal:
+            journal.write(data)
+
+    def test_torn_write_does_not_swallow_later_records(self):
+        todo_list = self.open_list()
+        self.add(todo_list, "one", "two", "three")
+        todo_list.close()
+        self.append_to_journal(b'{"seq": 4, "op": "add", "ta')
+
+        todo_list = self.open_list()
+        self.add(todo_list, "four", "five")
+        todo_list.close()
+
+        reloaded = self.open_list()
+        self.assertEqual([task.description for task in reloaded._select()],
+                         ["one", "two", "three", "four", "five"])
+        self.assertEqual(list(reloaded.tasks), [1, 2, 3, 4, 5])
+
+    def test_torn_write_seen_by_a_running_process(self):
+        running = self.open_list()
+        self.add(running, "one")
+        self.append_to_journal(b'{"seq": 2, "op": "add", "ta')
+        self.add(running, "two", "three")
+        running.close()
+
+        reloaded = self.open_list()
+        self.assertEqual([task.description for task in reloaded._select()], ["one", "two", "three"])
+
+    def test_corrupt_line_is_skipped(self):
+        todo_list = self.open_list()
+        self.add(todo_list, "one")
+        todo_list.close()
+        self.append_to_journal(b'not json\n')
+
+        todo_list = self.open_list()
+        self.add(todo_list, "two")
+        todo_list.close()
+
+        reloaded = self.open_list()
+        self.assertEqual([task.description for task in reloaded._select()], ["one", "two"])
+
+    def test_failed_batch_writes_nothing(self):
+        todo_list = self.open_list()
+        self.add(todo_list, "one")
+        with self.assertRaises(RuntimeError):
+            with todo_list.batch():
+                self.add(todo_list, "two", "three")
+                raise RuntimeError("import failed")
+        self.assertEqual(list(todo_list.tasks), [1])
+        self.add(todo_list, "four")
+        todo_list.close()
+
+        reloaded = self.open_list()
+        self.assertEqual([task.description for task in reloaded._select()], ["one", "four"])
+
+
+class SharedListTest(TodoListTestCase):
+
+    def test_change_checks_see_other_processes(self):
+        first, second = self.open_list(), self.open_list()
+        self.add(first, "one", "two")
+
+        # second has never seen the tasks first added
+        self.assertEqual(self.quietly(second.mark_completed, 1)[0], True)
+        self.assertTrue(self.quietly(second.edit_task, 2, "two, edited")[0])
+
+        result, output = self.quietly(first.mark_completed, 1)
+        self.assertIn("already completed", output)
+        self.quietly(first.remove_task, 2)
+        result, output = self.quietly(second.mark_pending, 2)
+        self.assertFalse(result)
+        self.assertIn("not found", output)
+
+        first.close()
+        second.close()
+        reloaded = self.open_list()
+        self.assertEqual([(task.id, task.completed) for task in reloaded._select()], [(1, True)])
+
+
+class LifetimeTest(TodoListTestCase):
+
+    def test_dropped_list_is_collected(self):
+        todo_list = TodoList(self.filename)
+        self.add(todo_list, "one")
+        reference = weakref.ref(todo_list)
+        del todo_list
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_context_manager_closes(self):
+        with TodoList(self.filename) as todo_list:
+            self.add(todo_list, "one")
+        self.assertIsNone(todo_list._journal)
+        self.assertEqual([task.description for task in self.open_list()._select()], ["one"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,150 +1,580 @@
+import argparse
+import atexit
+import bisect
+import contextlib
+import csv
+import heapq
 import json
 import os
+import sqlite3
+import time
+import weakref
 from datetime import datetime, timedelta
+from itertools import chain, islice
 import sys
 
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+PRIORITY_ORDER = ("High", "Medium", "Low")
+SORT_KEYS = ("id", "due", "priority")
+# Imported fields that must be text when present (CSV cells always are)
+IMPORT_TEXT_FIELDS = ('description', 'category', 'priority', 'due_date', 'created_at', 'completed_at')
+
+def lock_file(file):
+    """Block until this process holds the exclusive lock on an open file"""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+def unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+# Lists still open at interpreter exit get closed (journal synced); held
+# weakly, so a list that is dropped can still be garbage-collected
+_open_lists = weakref.WeakSet()
+
+@atexit.register
+def _close_open_lists():
+    for todo_list in list(_open_lists):
+        todo_list.close()
+
+class Task:
+    """
+    One to-do item. Slotted to keep per-task memory down on long lists.
+    
+    due_date is always a datetime or None; it is parsed once, when the task
+    is read from JSON or SQLite, and written back as an ISO string.
+    """
+    
+    __slots__ = ('id', 'description', 'category', 'priority', 'completed',
+                 'created_at', 'due_date', 'completed_at')
+    
+    def __init__(self, id, description, category="General", priority="Medium", completed=False,
+                 created_at=None, due_date=None, completed_at=None):
+        self.id = id
+        self.description = description
+        self.category = category
+        self.priority = priority
+        self.completed = completed
+        self.created_at = created_at
+        self.due_date = due_date
+        self.completed_at = completed_at
+    
+    @staticmethod
+    def parse_date(value):
+        """Return a due date as a datetime (or None), whatever form it is stored in"""
+        if value and isinstance(value, str):
+            return datetime.fromisoformat(value)
+        return value or None
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a task from its todo_data.json form"""
+        return cls(data['id'], data['description'], data.get('category', "General"),
+                   data.get('priority', "Medium"), bool(data.get('completed', False)),
+                   data.get('created_at'), cls.parse_date(data.get('due_date')),
+                   data.get('completed_at'))
+    
+    def to_dict(self):
+        """Return the todo_data.json form (completed_at only once completed)"""
+        data = {
+            'id': self.id,
+            'description': self.description,
+            'category': self.category,
+            'priority': self.priority,
+            'completed': self.completed,
+            'created_at': self.created_at,
+            'due_date': self.due_date.isoformat() if self.due_date else None
+        }
+        if self.completed_at is not None:
+            data['completed_at'] = self.completed_at
+        return data
+    
+    def is_overdue(self, today):
+        """Pending and due before `today` (a date)"""
+        return not self.completed and self.due_date is not None and self.due_date.date() < today
+
 class TodoList:
+    """
+    Task list persisted as a JSON snapshot plus an append-only journal.
+    
+    Every mutation is a small record (add / set / remove) that is applied in
+    memory and appended as one JSON line to `<filename>.journal`, so a change
+    costs the same whatever the size of the list. Once the journal holds as
+    many records as there are tasks (and at least COMPACT_MIN_OPS), it is
+    folded into a new snapshot written with write-and-rename, and truncated.
+    Loading reads the snapshot and replays the journal records after it.
+    
+    Inside `with todo_list.batch():` records are buffered and reach disk in
+    a single write (one journal append, or one snapshot for a big batch).
+    
+    Several processes can share one list. Writes hold an exclusive lock on
+    `<filename>.lock`, and before writing each process catches up with what
+    the others did: new journal lines are read from where it last stopped
+    and applied, and only a replaced snapshot (another process compacted)
+    costs a full reload. `refresh()` does the same catch-up without writing.
+    """
+    
+    COMPACT_MIN_OPS = 1000      # never compact more often than this
+    FSYNC_EVERY = 64            # fsync the journal after this many records...
+    FSYNC_INTERVAL = 1.0        # ...or once this many seconds have passed
+    
     def __init__(self, filename="todo_data.json"):
         self.filename = filename
-        self.tasks = []
+        self.journal_filename = filename + ".journal"
+        self.tasks = {}                            # id -> task, in id order
+        self.next_id = 1                           # ids are never reused
+        self.by_status = {False: {}, True: {}}     # completed -> {id: None}, an ordered set
+        self.by_category = {}                      # lowercased category -> {id: None}
+        self.by_priority = {}                      # priority -> {id: None}
+        self.by_due = {False: [], True: []}        # completed -> sorted [(due_date, id)]
+        self.seq = 0                               # sequence number of the last applied record
+        self.snapshot_seq = 0                      # sequence number covered by the snapshot
+        self._journal = None
+        self._journal_pos = 0                      # journal bytes already applied
+        self._snapshot_stat = None                 # identity of the snapshot that was loaded
+        self._lock_file = None
+        self._lock_depth = 0
+        self._batch = None                         # records buffered by batch(), or None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
         self.load_tasks()
+        _open_lists.add(self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _index(self, task, loading=False):
+        """Add a task to the indexes and counters (load_tasks sorts the due lists once at the end)"""
+        self.by_status[task.completed][task.id] = None
+        category = task.category.lower()
+        self.by_category.setdefault(category, {})[task.id] = None
+        self.by_priority.setdefault(task.priority, {})[task.id] = None
+        if task.due_date is not None:
+            if loading:
+                self.by_due[task.completed].append((task.due_date, task.id))
+            else:
+                bisect.insort(self.by_due[task.completed], (task.due_date, task.id))
+    
+    def _unindex(self, task):
+        """Remove a task from the indexes and counters"""
+        self.by_status[task.completed].pop(task.id, None)
+        category = task.category.lower()
+        ids = self.by_category.get(category)
+        if ids is not None:
+            ids.pop(task.id, None)
+            if not ids:
+                del self.by_category[category]
+        ids = self.by_priority.get(task.priority)
+        if ids is not None:
+            ids.pop(task.id, None)
+            if not ids:
+                del self.by_priority[task.priority]
+        if task.due_date is not None:
+            due = self.by_due[task.completed]
+            position = bisect.bisect_left(due, (task.due_date, task.id))
+            if position < len(due) and due[position][1] == task.id:
+                del due[position]
+    
+    def _reset(self):
+        self.tasks = {}
+        self.next_id = 1
+        self.by_status = {False: {}, True: {}}
+        self.by_category = {}
+        self.by_priority = {}
+        self.by_due = {False: [], True: []}
+        self.seq = 0
+        self.snapshot_seq = 0
+    
+    def __len__(self):
+        return len(self.tasks)
+    
+    def _get(self, task_id):
+        """Return the task with this id, or None"""
+        return self.tasks.get(task_id)
+    
+    def _select(self, filter_type="all", category=None, sort="id"):
+        """
+        Lazily yield tasks matching the filters, using the indexes.
+        
+        sort="id" walks the tasks in id order (or sorts a small status or
+        category); "due" merges the sorted due-date lists (tasks without a
+        due date come last); "priority" walks the priority index High,
+        Medium, Low, then any other priority, each in id order.
+        """
+        statuses = {"completed": (True,), "pending": (False,)}.get(filter_type, (False, True))
+        selected = self.tasks if len(statuses) == 2 else self.by_status[statuses[0]]
+        ids = self.tasks
+        if selected is not self.tasks:
+            # The status index is in the order tasks last changed, not id order:
+            # sort a small status, otherwise walk every id and test membership
+            if len(selected) * 8 < len(self.tasks):
+                ids = sorted(selected)
+            else:
+                ids = (task_id for task_id in self.tasks if task_id in selected)
+        in_category = None
+        if category and category != "all":
+            in_category = self.by_category.get(category.lower(), {})
+            if sort == "id" and len(in_category) * 8 < len(selected):
+                # A small category: sorting its matches beats walking everything
+                ids = sorted(task_id for task_id in in_category if task_id in selected)
+                in_category = None
+        
+        if sort == "due":
+            dated = (task_id for _, task_id in heapq.merge(*(self.by_due[status] for status in statuses)))
+            undated = (task_id for task_id in ids if self.tasks[task_id].due_date is None)
+            ids = chain(dated, undated)
+        elif sort == "priority":
+            others = sorted(priority for priority in self.by_priority if priority not in PRIORITY_ORDER)
+            # Like the status index, each priority's ids need sorting back into id order
+            ids = (task_id for priority in (*PRIORITY_ORDER, *others)
+                   for task_id in sorted(self.by_priority.get(priority, ())) if task_id in selected)
+        
+        for task_id in ids:
+            if in_category is None or task_id in in_category:
+                yield self.tasks[task_id]
+    
+    def _count(self, filter_type="all", category=None):
+        """Return (matching tasks, pending among them) without visiting the tasks"""
+        if category and category != "all":
+            in_category = self.by_category.get(category.lower(), {})
+            total = len(in_category)
+            pending = sum(1 for task_id in in_category if task_id in self.by_status[False])
+        else:
+            total = len(self.tasks)
+            pending = len(self.by_status[False])
+        if filter_type == "completed":
+            return total - pending, 0
+        if filter_type == "pending":
+            return pending, pending
+        return total, pending
+    
+    def _apply(self, record):
+        """Apply one journal record to the in-memory state and indexes"""
+        op = record['op']
+        if op == 'add':
+            task = Task.from_dict(record['task'])
+            self.tasks[task.id] = task
+            self._index(task)
+            self.next_id = max(self.next_id, task.id + 1)
+        elif op == 'set':
+            task = self.tasks.get(record['id'])
+            if task is not None:
+                self._unindex(task)
+                for field, value in record.get('fields', {}).items():
+                    if field == 'due_date':
+                        value = Task.parse_date(value)
+                    setattr(task, field, value)
+                for field in record.get('drop', ()):
+                    setattr(task, field, None)
+                self._index(task)
+        elif op == 'remove':
+            for task_id in record['ids']:
+                task = self.tasks.pop(task_id, None)
+                if task is not None:
+                    self._unindex(task)
+        self.seq = record['seq']
+    
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the cross-process lock for the block (re-entrant)"""
+        if self._lock_depth == 0:
+            if self._lock_file is None:
+                self._lock_file = open(self.filename + ".lock", 'a+')
+            lock_file(self._lock_file)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                unlock_file(self._lock_file)
+    
+    def _snapshot_signature(self):
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+    
+    def refresh(self):
+        """Apply changes other processes have written since this one last looked"""
+        with self._locked():
+            try:
+                journal_size = os.path.getsize(self.journal_filename)
+            except FileNotFoundError:
+                journal_size = 0
+            # A new snapshot or a shorter journal means another process compacted
+            if self._snapshot_signature() != self._snapshot_stat or journal_size < self._journal_pos:
+                self.load_tasks()
+            else:
+                try:
+                    self._journal_pos = self._replay(self._journal_pos)
+                except Exception as e:
+                    print(f"Error replaying journal: {e}")
+    
+    @contextlib.contextmanager
+    def _writing(self):
+        """
+        Hold the lock, caught up with other processes, around a lookup and
+        the _commit it leads to, so checks like "not found" or "already
+        completed" see the current list rather than this process's copy
+        """
+        with self._locked():
+            if self._batch is None:
+                self.refresh()
+            yield
+    
+    def _commit(self, op, **fields):
+        """Apply a mutation and append it to the journal (or the open batch)"""
+        with self._locked():
+            # An enclosing _writing() or batch() has already caught up
+            if self._lock_depth == 1:
+                self.refresh()
+            if op == 'add':
+                # Another process may have taken the id this one expected
+                fields['task']['id'] = self.next_id
+            record = {'seq': self.seq + 1, 'op': op, **fields}
+            self._apply(record)
+            if self._batch is not None:
+                self._batch.append(record)
+            else:
+                self._write([record])
+        return record
+    
+    def _write(self, records):
+        """Append records to the journal, or fold everything into a new snapshot once it is long enough"""
+        if self.seq - self.snapshot_seq >= max(self.COMPACT_MIN_OPS, len(self.tasks)):
+            self._save()
+            return
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_filename, 'a', encoding='utf-8')
+            self._journal.write(''.join(json.dumps(record) + '\n' for record in records))
+            self._journal.flush()
+            self._journal_pos = os.fstat(self._journal.fileno()).st_size
+            self._unsynced += len(records)
+            if self._unsynced >= self.FSYNC_EVERY or time.monotonic() - self._last_sync >= self.FSYNC_INTERVAL:
+                self.sync()
+        except Exception as e:
+            print(f"Error saving tasks: {e}")
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Apply every change made inside the block with one persistence write.
+        If the block raises, nothing is written and the in-memory list goes
+        back to what is on disk.
+        """
+        if self._batch is not None:
+            yield self      # already inside a batch
+            return
+        # Hold the lock throughout so the buffered records' sequence numbers stay ours
+        with self._locked():
+            self.refresh()
+            self._batch = []
+            try:
+                yield self
+            except BaseException:
+                self._batch = None
+                self._load()    # drop the buffered changes from memory
+                raise
+            records, self._batch = self._batch, None
+            if records:
+                self._write(records)
+                self.sync()
+    
+    def sync(self):
+        """Force journal records written so far to disk"""
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def close(self):
+        """Flush and close the journal and lock file (also run at interpreter exit)"""
+        if self._journal is not None:
+            self.sync()
+            self._journal.close()
+            self._journal = None
+        if self._lock_file is not None and self._lock_depth == 0:
+            self._lock_file.close()
+            self._lock_file = None
+    
+    def _replay(self, position=0):
+        """
+        Apply the journal records from byte `position` on; returns where reading stopped.
+        
+        A line that does not parse is skipped. A final line with no newline is
+        a write torn by a crash: it is cut off the file (the caller holds the
+        lock), so the next append starts on a line of its own instead of being
+        glued onto the fragment.
+        """
+        if not os.path.exists(self.journal_filename):
+            return 0
+        with open(self.journal_filename, 'rb') as journal:
+            journal.seek(position)
+            for line in journal:
+                if not line.endswith(b'\n'):
+                    break
+                position += len(line)
+                try:
+                    record = json.loads(line)
+                    seq = record['seq']
+                except (ValueError, KeyError, TypeError):
+                    continue    # corrupt record
+                # Records already folded into the snapshot are skipped
+                if seq > self.seq:
+                    self._apply(record)
+            torn = journal.seek(0, os.SEEK_END) > position
+        if torn:
+            os.truncate(self.journal_filename, position)
+        return position
     
     def load_tasks(self):
-        """Load tasks from JSON file"""
+        """Load tasks from the JSON snapshot and replay the journal"""
+        with self._locked():
+            self._load()
+    
+    def _load(self):
+        self._reset()
+        self._snapshot_stat, self._journal_pos = None, 0
         try:
             if os.path.exists(self.filename):
                 with open(self.filename, 'r') as file:
+                    stat = os.fstat(file.fileno())
+                    self._snapshot_stat = stat.st_ino, stat.st_mtime_ns, stat.st_size
                     data = json.load(file)
-                    self.tasks = data.get('tasks', [])
-                    # Convert string dates back to datetime objects
-                    for task in self.tasks:
-                        if task.get('due_date'):
-                            task['due_date'] = datetime.fromisoformat(task['due_date'])
-            else:
-                self.tasks = []
+                    for task_data in data.get('tasks', []):
+                        task = Task.from_dict(task_data)
+                        self.tasks[task.id] = task
+                        self._index(task, loading=True)
+                    for due in self.by_due.values():
+                        due.sort()
+                    # Files written before ids were stable have no next_id
+                    self.next_id = data.get('next_id', max(self.tasks, default=0) + 1)
+                    self.seq = self.snapshot_seq = data.get('seq', 0)
         except (json.JSONDecodeError, KeyError):
-            self.tasks = []
+            self._reset()
         except Exception as e:
             print(f"Error loading tasks: {e}")
-            self.tasks = []
+            self._reset()
+        
+        try:
+            self._journal_pos = self._replay()
+        except Exception as e:
+            print(f"Error replaying journal: {e}")
     
     def save_tasks(self):
-        """Save tasks to JSON file"""
+        """Write a full snapshot of the tasks and truncate the journal"""
+        with self._locked():
+            if self._batch is None:
+                self.refresh()
+            self._save()
+    
+    def _save(self):
         try:
-            # Convert datetime objects to strings for JSON serialization
-            tasks_to_save = []
-            for task in self.tasks:
-                task_copy = task.copy()
-                if task_copy.get('due_date') and isinstance(task_copy['due_date'], datetime):
-                    task_copy['due_date'] = task_copy['due_date'].isoformat()
-                tasks_to_save.append(task_copy)
+            tasks_to_save = [task.to_dict() for task in self.tasks.values()]
             
-            with open(self.filename, 'w') as file:
-                json.dump({'tasks': tasks_to_save}, file, indent=2)
+            # Write to a temporary file and rename, so a crash never leaves a half-written snapshot
+            temp_filename = self.filename + ".tmp"
+            with open(temp_filename, 'w') as file:
+                json.dump({'tasks': tasks_to_save, 'next_id': self.next_id, 'seq': self.seq}, file, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_filename, self.filename)
+            self.snapshot_seq = self.seq
+            self._snapshot_stat = self._snapshot_signature()
+            
+            # The snapshot now covers every journal record
+            if self._journal is not None:
+                self._journal.close()
+            # Truncate, then append: other processes append to the same file
+            with open(self.journal_filename, 'w', encoding='utf-8'):
+                pass
+            self._journal = open(self.journal_filename, 'a', encoding='utf-8')
+            self._journal_pos = 0
+            self._unsynced = 0
         except Exception as e:
             print(f"Error saving tasks: {e}")
     
+    def _add(self, description, category="General", priority="Medium", due_date=None,
+             completed=False, created_at=None, completed_at=None):
+        """Add a task without reporting it; returns the new id"""
+        task = Task(self.next_id, description, category, priority, completed,
+                    created_at or datetime.now().isoformat(), due_date, completed_at)
+        return self._commit('add', task=task.to_dict())['task']['id']
+    
     def add_task(self, description, category="General", priority="Medium", due_date=None):
         """Add a new task to the list"""
-        task = {
-            'id': len(self.tasks) + 1,
-            'description': description,
-            'category': category,
-            'priority': priority,
-            'completed': False,
-            'created_at': datetime.now().isoformat(),
-            'due_date': due_date
-        }
-        self.tasks.append(task)
-        self.save_tasks()
-        print(f"✓ Task added successfully (ID: {task['id']})")
+        task_id = self._add(description, category, priority, due_date)
+        print(f"✓ Task added successfully (ID: {task_id})")
     
     def remove_task(self, task_id):
         """Remove a task by ID"""
-        for i, task in enumerate(self.tasks):
-            if task['id'] == task_id:
-                removed_task = self.tasks.pop(i)
-                # Reassign IDs to maintain sequence
-                for j in range(i, len(self.tasks)):
-                    self.tasks[j]['id'] = j + 1
-                self.save_tasks()
-                print(f"✓ Task '{removed_task['description']}' removed successfully")
-                return True
-        print(f"✗ Task with ID {task_id} not found")
-        return False
+        with self._writing():
+            removed_task = self._get(task_id)
+            if removed_task is None:
+                print(f"✗ Task with ID {task_id} not found")
+                return False
+            self._commit('remove', ids=[task_id])
+        print(f"✓ Task '{removed_task.description}' removed successfully")
+        return True
     
     def mark_completed(self, task_id):
         """Mark a task as completed"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                if not task['completed']:
-                    task['completed'] = True
-                    task['completed_at'] = datetime.now().isoformat()
-                    self.save_tasks()
-                    print(f"✓ Task '{task['description']}' marked as completed")
-                else:
-                    print(f"ℹ Task '{task['description']}' is already completed")
+        with self._writing():
+            task = self._get(task_id)
+            if task is None:
+                print(f"✗ Task with ID {task_id} not found")
+                return False
+            if task.completed:
+                print(f"ℹ Task '{task.description}' is already completed")
                 return True
-        print(f"✗ Task with ID {task_id} not found")
-        return False
+            self._commit('set', id=task_id, fields={'completed': True, 'completed_at': datetime.now().isoformat()})
+        print(f"✓ Task '{task.description}' marked as completed")
+        return True
     
     def mark_pending(self, task_id):
         """Mark a completed task as pending"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                if task['completed']:
-                    task['completed'] = False
-                    task.pop('completed_at', None)
-                    self.save_tasks()
-                    print(f"✓ Task '{task['description']}' marked as pending")
-                else:
-                    print(f"ℹ Task '{task['description']}' is already pending")
+        with self._writing():
+            task = self._get(task_id)
+            if task is None:
+                print(f"✗ Task with ID {task_id} not found")
+                return False
+            if not task.completed:
+                print(f"ℹ Task '{task.description}' is already pending")
                 return True
-        print(f"✗ Task with ID {task_id} not found")
-        return False
+            self._commit('set', id=task_id, fields={'completed': False}, drop=['completed_at'])
+        print(f"✓ Task '{task.description}' marked as pending")
+        return True
     
-    def view_tasks(self, filter_type="all", category=None):
-        """View tasks with various filters"""
-        if not self.tasks:
-            print("No tasks found. Add some tasks to get started!")
-            return
-        
-        filtered_tasks = self.tasks.copy()
-        
-        # Apply filters
-        if filter_type == "completed":
-            filtered_tasks = [task for task in filtered_tasks if task['completed']]
-        elif filter_type == "pending":
-            filtered_tasks = [task for task in filtered_tasks if not task['completed']]
-        
-        if category and category != "all":
-            filtered_tasks = [task for task in filtered_tasks if task['category'].lower() == category.lower()]
-        
-        if not filtered_tasks:
-            print("No tasks match the current filter")
-            return
-        
-        # Display tasks
-        print("\n" + "="*80)
-        print(f"{'TO-DO LIST':^80}")
-        print("="*80)
-        print(f"{'ID':<4} {'Status':<10} {'Priority':<8} {'Category':<12} {'Description':<30} {'Due Date':<12}")
-        print("-"*80)
-        
-        for task in filtered_tasks:
-            status = "✓" if task['completed'] else "◯"
-            priority = task['priority']
-            due_date = task.get('due_date', '')
-            if due_date and isinstance(due_date, str):
-                due_date = datetime.fromisoformat(due_date).strftime('%Y-%m-%d')
-            elif due_date and isinstance(due_date, datetime):
-                due_date = due_date.strftime('%Y-%m-%d')
+    @staticmethod
+    def _render(tasks, today):
+        """Yield one formatted table row per task"""
+        for task in tasks:
+            status = "✓" if task.completed else "◯"
+            priority = task.priority
+            due_date = task.due_date.strftime('%Y-%m-%d') if task.due_date else ''
             
             # Color coding for priority and overdue tasks
-            if task['completed']:
+            if task.completed:
                 status_display = f"\033[92m{status}\033[0m"  # Green
             else:
-                if due_date and datetime.now().date() > datetime.fromisoformat(task.get('due_date', datetime.now().isoformat())).date():
+                if task.is_overdue(today):
                     status_display = f"\033[91m{status}\033[0m"  # Red for overdue
                 else:
                     status_display = status
@@ -156,30 +586,79 @@ class TodoList:
             else:
                 priority_display = f"\033[92m{priority}\033[0m"  # Green
             
-            print(f"{task['id']:<4} {status_display:<10} {priority_display:<8} {task['category']:<12} {task['description'][:28]:<30} {str(due_date):<12}")
+            yield f"{task.id:<4} {status_display:<10} {priority_display:<8} {task.category:<12} {task.description[:28]:<30} {due_date:<12}\n"
+    
+    def view_tasks(self, filter_type="all", category=None, sort="id", page=None, page_size=50):
+        """
+        View tasks with various filters, sorted by id, due date or priority.
+        
+        Rows are produced lazily and written in chunks; with `page` only
+        that page (1-based, `page_size` rows) is rendered.
+        """
+        total, pending = self._count(filter_type, category)
+        if not total:
+            print("No tasks found. Add some tasks to get started!" if not len(self) else "No tasks match the current filter")
+            return
+        
+        tasks = self._select(filter_type, category, sort)
+        if page is not None:
+            tasks = islice(tasks, (page - 1) * page_size, page * page_size)
+        
+        # Display tasks
+        out = sys.stdout
+        out.write("\n" + "="*80 + "\n" + f"{'TO-DO LIST':^80}" + "\n" + "="*80 + "\n")
+        out.write(f"{'ID':<4} {'Status':<10} {'Priority':<8} {'Category':<12} {'Description':<30} {'Due Date':<12}\n")
+        out.write("-"*80 + "\n")
         
-        print("="*80)
-        print(f"Total tasks: {len(filtered_tasks)} (Pending: {len([t for t in filtered_tasks if not t['completed']])})")
+        rows = self._render(tasks, datetime.now().date())
+        while True:
+            chunk = ''.join(islice(rows, 1000))
+            if not chunk:
+                break
+            out.write(chunk)
+        
+        out.write("="*80 + "\n")
+        if page is not None:
+            pages = (total + page_size - 1) // page_size
+            out.write(f"Page {page} of {pages} | ")
+        out.write(f"Total tasks: {total} (Pending: {pending})\n")
+        out.flush()
+    
+    def stats(self):
+        """
+        Return task counts: total, completed, pending, overdue, and per
+        priority and per category. Read from the live counters; only the
+        overdue count needs a bisect of the pending due dates.
+        """
+        # Pending tasks due before the start of today are overdue
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        completed = len(self.by_status[True])
+        return {
+            'total': len(self.tasks),
+            'completed': completed,
+            'pending': len(self.tasks) - completed,
+            'overdue': bisect.bisect_left(self.by_due[False], (today,)),
+            'priority': {priority: len(ids) for priority, ids in self.by_priority.items()},
+            # Categories match case-insensitively; report each under one of its tasks' spelling
+            'category': {self.tasks[next(iter(ids))].category: len(ids) for ids in self.by_category.values()}
+        }
     
     def get_statistics(self):
         """Display statistics about tasks"""
-        if not self.tasks:
+        stats = self.stats()
+        if not stats['total']:
             print("No tasks available for statistics")
             return
         
-        total = len(self.tasks)
-        completed = len([task for task in self.tasks if task['completed']])
-        pending = total - completed
+        total = stats['total']
+        completed = stats['completed']
+        pending = stats['pending']
+        overdue = stats['overdue']
         
         # Tasks by priority
-        high_priority = len([task for task in self.tasks if task['priority'] == "High"])
-        medium_priority = len([task for task in self.tasks if task['priority'] == "Medium"])
-        low_priority = len([task for task in self.tasks if task['priority'] == "Low"])
-        
-        # Overdue tasks
-        overdue = len([task for task in self.tasks 
-                      if not task['completed'] and task.get('due_date') 
-                      and datetime.now().date() > datetime.fromisoformat(task['due_date']).date()])
+        high_priority = stats['priority'].get("High", 0)
+        medium_priority = stats['priority'].get("Medium", 0)
+        low_priority = stats['priority'].get("Low", 0)
         
         print("\n" + "="*50)
         print("TASK STATISTICS")
@@ -191,40 +670,301 @@ class TodoList:
         print(f"High priority: {high_priority}")
         print(f"Medium priority: {medium_priority}")
         print(f"Low priority: {low_priority}")
+        print("-"*50)
+        for category, count in sorted(stats['category'].items(), key=lambda item: (-item[1], item[0])):
+            print(f"{category}: {count}")
         print("="*50)
     
     def clear_completed(self):
         """Remove all completed tasks"""
-        completed_count = len([task for task in self.tasks if task['completed']])
-        if completed_count == 0:
-            print("No completed tasks to clear")
-            return
-        
-        self.tasks = [task for task in self.tasks if not task['completed']]
-        # Reassign IDs
-        for i, task in enumerate(self.tasks):
-            task['id'] = i + 1
-        self.save_tasks()
+        with self._writing():
+            completed_ids = [task.id for task in self._select("completed")]
+            completed_count = len(completed_ids)
+            if completed_count == 0:
+                print("No completed tasks to clear")
+                return
+            
+            self._commit('remove', ids=completed_ids)
         print(f"✓ Removed {completed_count} completed tasks")
     
     def edit_task(self, task_id, new_description=None, new_category=None, new_priority=None, new_due_date=None):
         """Edit an existing task"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                if new_description:
-                    task['description'] = new_description
-                if new_category:
-                    task['category'] = new_category
-                if new_priority:
-                    task['priority'] = new_priority
-                if new_due_date:
-                    task['due_date'] = new_due_date
-                
-                self.save_tasks()
-                print(f"✓ Task ID {task_id} updated successfully")
-                return True
-        print(f"✗ Task with ID {task_id} not found")
-        return False
+        changes = {}
+        if new_description:
+            changes['description'] = new_description
+        if new_category:
+            changes['category'] = new_category
+        if new_priority:
+            changes['priority'] = new_priority
+        if new_due_date:
+            changes['due_date'] = new_due_date.isoformat() if isinstance(new_due_date, datetime) else new_due_date
+        
+        with self._writing():
+            if self._get(task_id) is None:
+                print(f"✗ Task with ID {task_id} not found")
+                return False
+            if changes:
+                self._commit('set', id=task_id, fields=changes)
+        print(f"✓ Task ID {task_id} updated successfully")
+        return True
+    
+    def import_tasks(self, path, file_format=None):
+        """Add every task in a CSV or NDJSON file ('-' for stdin) with one persistence write"""
+        file_format = detect_format(path, file_format)
+        imported = skipped = 0
+        with open_data(path, 'r') as file:
+            rows = csv.DictReader(file) if file_format == 'csv' else read_ndjson(file)
+            with self.batch():
+                for row in rows:
+                    if not isinstance(row, dict) or any(
+                            row.get(field) is not None and not isinstance(row.get(field), str)
+                            for field in IMPORT_TEXT_FIELDS):
+                        skipped += 1
+                        continue
+                    description = (row.get('description') or '').strip()
+                    if not description:
+                        skipped += 1
+                        continue
+                    completed = row.get('completed')
+                    if isinstance(completed, str):
+                        completed = completed.strip().lower() in ('1', 'true', 'yes', 'y')
+                    try:
+                        due_date = Task.parse_date(row.get('due_date'))
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    self._add(description, row.get('category') or "General", row.get('priority') or "Medium",
+                              due_date, bool(completed), row.get('created_at') or None,
+                              (row.get('completed_at') or datetime.now().isoformat()) if completed else None)
+                    imported += 1
+        print(f"✓ Imported {imported} tasks" + (f" ({skipped} invalid rows skipped)" if skipped else ""))
+        return imported
+    
+    def export_tasks(self, path, file_format=None):
+        """Write every task to a CSV or NDJSON file ('-' for stdout), streaming in id order"""
+        file_format = detect_format(path, file_format)
+        exported = 0
+        with open_data(path, 'w') as file:
+            if file_format == 'csv':
+                writer = csv.DictWriter(file, fieldnames=Task.__slots__)
+                writer.writeheader()
+                for task in self._select():
+                    writer.writerow(task.to_dict())
+                    exported += 1
+            else:
+                for task in self._select():
+                    file.write(json.dumps(task.to_dict()) + '\n')
+                    exported += 1
+        if path != '-':
+            print(f"✓ Exported {exported} tasks to '{path}'")
+        return exported
+
+class SQLiteTodoList(TodoList):
+    """
+    TodoList stored in an SQLite database instead of JSON.
+    
+    Nothing is loaded at startup; every view, filter and statistic is a query
+    served by the indexes on completed, category, priority and due_date, so
+    opening a list of a million tasks costs the same as opening an empty one.
+    Due dates are stored as ISO strings, which sort and compare as dates.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL COLLATE NOCASE,
+            priority TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT,
+            completed_at TEXT,
+            due_date TEXT
+        );
+        CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed, due_date);
+        CREATE INDEX IF NOT EXISTS tasks_category ON tasks (category);
+        CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+        CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+    """
+    COLUMNS = Task.__slots__
+    
+    def __init__(self, filename="todo_data.db"):
+        self.conn = None
+        super().__init__(filename)
+    
+    @staticmethod
+    def _row_to_task(row):
+        task = Task(*row)
+        task.completed = bool(task.completed)
+        task.due_date = Task.parse_date(task.due_date)
+        return task
+    
+    def load_tasks(self):
+        """Open the database; tasks stay on disk until queried"""
+        self.conn = sqlite3.connect(self.filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+        self.next_id = row[0] + 1 if row else 1
+    
+    def save_tasks(self):
+        """Every change is committed as it is made"""
+        self.conn.commit()
+    
+    def refresh(self):
+        """Queries always see what other connections have committed"""
+    
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    def _commit(self, op, **fields):
+        """
+        Run a mutation as one SQL transaction (or as part of the open batch).
+        sqlite3.Error is raised to the caller; a batch rolls back as a whole.
+        """
+        if self._batch is None:
+            with self.conn:
+                self._execute(op, fields)
+        else:
+            self._execute(op, fields)
+        return fields
+    
+    # Columns an add inserts; SQLite assigns the id, so connections sharing the file never collide
+    INSERT_COLUMNS = tuple(column for column in COLUMNS if column != 'id')
+    
+    def _execute(self, op, fields):
+        if op == 'add':
+            task = fields['task']
+            cursor = self.conn.execute(
+                f"INSERT INTO tasks ({', '.join(self.INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(self.INSERT_COLUMNS))})",
+                [task.get(column) for column in self.INSERT_COLUMNS])
+            task['id'] = cursor.lastrowid
+            self.next_id = max(self.next_id, task['id'] + 1)
+        elif op == 'set':
+            changes = dict(fields.get('fields', {}))
+            changes.update((column, None) for column in fields.get('drop', ()))
+            assignments = ', '.join(f"{column} = ?" for column in changes)
+            self.conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?",
+                              [*changes.values(), fields['id']])
+        elif op == 'remove':
+            ids = fields['ids']
+            # Stay under SQLite's bound parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                self.conn.execute(f"DELETE FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+    
+    @contextlib.contextmanager
+    def _writing(self):
+        """Run a lookup and the write it leads to in one IMMEDIATE transaction"""
+        if self._batch is not None:
+            yield
+            return
+        self._batch = True
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                yield
+        finally:
+            self._batch = None
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """Run every change made inside the block in one transaction"""
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = True
+        try:
+            with self.conn:
+                yield self
+        finally:
+            self._batch = None
+    
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    
+    def _get(self, task_id):
+        row = self.conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._row_to_task(row) if row else None
+    
+    @staticmethod
+    def _filters(filter_type, category):
+        conditions, params = [], []
+        if filter_type == "completed":
+            conditions.append("completed = 1")
+        elif filter_type == "pending":
+            conditions.append("completed = 0")
+        if category and category != "all":
+            conditions.append("category = ?")
+            params.append(category)
+        return conditions, params
+    
+    def _query(self, conditions, params, order):
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor = self.conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM tasks {where} ORDER BY {order}", params)
+        for row in cursor:
+            yield self._row_to_task(row)
+    
+    def _select(self, filter_type="all", category=None, sort="id"):
+        """Yield matching tasks straight from the cursor(s), each ordered by an index"""
+        conditions, params = self._filters(filter_type, category)
+        if sort == "due":
+            # Split on NULL so each half is an index range scan, undated tasks last
+            return chain(self._query(conditions + ["due_date IS NOT NULL"], params, "due_date, id"),
+                         self._query(conditions + ["due_date IS NULL"], params, "id"))
+        if sort == "priority":
+            placeholders = ', '.join('?' * len(PRIORITY_ORDER))
+            return chain(*(self._query(conditions + ["priority = ?"], params + [priority], "id")
+                           for priority in PRIORITY_ORDER),
+                         self._query(conditions + [f"priority NOT IN ({placeholders})"],
+                                     params + list(PRIORITY_ORDER), "priority, id"))
+        return self._query(conditions, params, "id")
+    
+    def _count(self, filter_type="all", category=None):
+        conditions, params = self._filters(filter_type, category)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        total, pending = self.conn.execute(f"SELECT COUNT(*), SUM(completed = 0) FROM tasks {where}", params).fetchone()
+        return total, pending or 0
+    
+    def stats(self):
+        by_status = dict(self.conn.execute("SELECT completed, COUNT(*) FROM tasks GROUP BY completed"))
+        priorities = dict(self.conn.execute("SELECT priority, COUNT(*) FROM tasks GROUP BY priority"))
+        categories = dict(self.conn.execute("SELECT MIN(category), COUNT(*) FROM tasks GROUP BY category"))
+        # Due before today's midnight, matching the JSON backend's date comparison
+        overdue = self.conn.execute("SELECT COUNT(*) FROM tasks WHERE completed = 0 AND due_date < ?",
+                                    (datetime.now().date().isoformat(),)).fetchone()[0]
+        return {'total': sum(by_status.values()), 'completed': by_status.get(1, 0),
+                'pending': by_status.get(0, 0), 'overdue': overdue,
+                'priority': priorities, 'category': categories}
+
+
+def detect_format(path, file_format=None):
+    """Pick 'csv' or 'ndjson' from an explicit format or the file extension"""
+    if file_format:
+        return file_format
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl', '.json') or path == '-':
+        return 'ndjson'
+    raise ValueError(f"Cannot tell the format of '{path}'; use --format csv or ndjson")
+
+def read_ndjson(file):
+    """Yield the value on each non-blank line of an NDJSON file, or None for a line that is not JSON"""
+    for line in file:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+def open_data(path, mode):
+    """Open a data file, or stdin/stdout for '-'"""
+    if path == '-':
+        return contextlib.nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    return open(path, mode, newline='', encoding='utf-8')
 
 def display_menu():
     """Display the main menu"""
@@ -284,104 +1024,199 @@ def get_task_details():
     
     return description, category, priority, due_date
 
-def main():
+def build_parser():
+    """Command-line options and the non-interactive subcommands"""
+    parser = argparse.ArgumentParser(description="To-Do List Application (run without a command for the interactive menu)")
+    parser.add_argument('--storage', choices=['json', 'sqlite'], default='json',
+                        help="where tasks are kept (default: json)")
+    parser.add_argument('--file', help="data file (default: todo_data.json or todo_data.db)")
+    commands = parser.add_subparsers(dest='command')
+    
+    add = commands.add_parser('add', help="add a task")
+    add.add_argument('description')
+    add.add_argument('--category', default="General")
+    add.add_argument('--priority', choices=["High", "Medium", "Low"], default="Medium")
+    add.add_argument('--due', type=lambda value: datetime.strptime(value, '%Y-%m-%d'), help="due date, YYYY-MM-DD")
+    
+    done = commands.add_parser('done', help="mark tasks as completed")
+    done.add_argument('ids', type=int, nargs='+')
+    
+    rm = commands.add_parser('rm', help="remove tasks")
+    rm.add_argument('ids', type=int, nargs='+')
+    
+    ls = commands.add_parser('ls', help="list tasks")
+    ls.add_argument('--status', choices=["all", "pending", "completed"], default="all")
+    ls.add_argument('--category')
+    ls.add_argument('--sort', choices=SORT_KEYS, default="id")
+    ls.add_argument('--page', type=int, help="show only this page (1-based)")
+    ls.add_argument('--page-size', type=int, help="rows per page (default: 50)")
+    
+    stats = commands.add_parser('stats', help="show task statistics")
+    stats.add_argument('--json', action='store_true', help="print the counts as JSON")
+    
+    for name, help_text in (('import', "add tasks from a CSV or NDJSON file"), ('export', "write all tasks to a CSV or NDJSON file")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('path', help="file path, or - for stdin/stdout")
+        command.add_argument('--format', choices=['csv', 'ndjson'], help="default: from the file extension")
+    return parser
+
+def run_command(todo_list, args):
+    """Run one subcommand; returns the process exit status"""
+    if args.command == 'add':
+        todo_list.add_task(args.description, args.category, args.priority, args.due)
+    elif args.command in ('done', 'rm'):
+        action = todo_list.mark_completed if args.command == 'done' else todo_list.remove_task
+        with todo_list.batch():
+            results = [action(task_id) for task_id in args.ids]
+        return 0 if all(results) else 1
+    elif args.command == 'ls':
+        page, page_size = args.page, args.page_size
+        if page is not None or page_size is not None:
+            page = 1 if page is None else page
+            page_size = 50 if page_size is None else page_size
+            if page < 1 or page_size < 1:
+                raise ValueError("--page and --page-size must be positive")
+        todo_list.view_tasks(args.status, args.category, args.sort, page, page_size or 50)
+    elif args.command == 'stats':
+        if args.json:
+            print(json.dumps(todo_list.stats(), indent=2))
+        else:
+            todo_list.get_statistics()
+    elif args.command == 'import':
+        todo_list.import_tasks(args.path, args.format)
+    elif args.command == 'export':
+        todo_list.export_tasks(args.path, args.format)
+    return 0
+
+def main(argv=None):
     """Main function to run the To-Do List application"""
-    todo_list = TodoList()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.storage == 'sqlite':
+        todo_list = SQLiteTodoList(args.file or "todo_data.db")
+    else:
+        todo_list = TodoList(args.file or "todo_data.json")
+    
+    if args.command:
+        try:
+            return run_command(todo_list, args)
+        except BrokenPipeError:
+            # Output piped into a reader that stopped early (e.g. head)
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+        finally:
+            todo_list.close()
     
+    run_menu(todo_list)
+    return 0
+
+def run_menu(todo_list):
+    """Interactive menu loop"""
     print("Welcome to the To-Do List Application!")
-    print("Your tasks are automatically saved to 'todo_data.json'")
+    print(f"Your tasks are automatically saved to '{todo_list.filename}'")
     
     while True:
         display_menu()
         choice = get_user_choice()
+        # Pick up whatever other processes changed while this one waited for input
+        todo_list.refresh()
         
-        if choice == 1:  # View all tasks
-            todo_list.view_tasks()
-        
-        elif choice == 2:  # Add new task
-            description, category, priority, due_date = get_task_details()
-            todo_list.add_task(description, category, priority, due_date)
-        
-        elif choice == 3:  # Mark task as completed
-            todo_list.view_tasks("pending")
-            try:
-                task_id = int(input("Enter task ID to mark as completed: "))
-                todo_list.mark_completed(task_id)
-            except ValueError:
-                print("Invalid task ID!")
-        
-        elif choice == 4:  # Mark task as pending
-            todo_list.view_tasks("completed")
-            try:
-                task_id = int(input("Enter task ID to mark as pending: "))
-                todo_list.mark_pending(task_id)
-            except ValueError:
-                print("Invalid task ID!")
-        
-        elif choice == 5:  # Remove task
-            todo_list.view_tasks()
-            try:
-                task_id = int(input("Enter task ID to remove: "))
-                todo_list.remove_task(task_id)
-            except ValueError:
-                print("Invalid task ID!")
-        
-        elif choice == 6:  # Edit task
-            todo_list.view_tasks()
-            try:
-                task_id = int(input("Enter task ID to edit: "))
-                print("Leave blank to keep current value:")
-                new_description = input("New description: ").strip()
-                new_category = input("New category: ").strip()
-                new_priority = input("New priority (High/Medium/Low): ").strip()
+        try:
+            if choice == 1:  # View all tasks
+                todo_list.view_tasks()
+            
+            elif choice == 2:  # Add new task
+                description, category, priority, due_date = get_task_details()
+                todo_list.add_task(description, category, priority, due_date)
+            
+            elif choice == 3:  # Mark task as completed
+                todo_list.view_tasks("pending")
+                try:
+                    task_id = int(input("Enter task ID to mark as completed: "))
+                    todo_list.mark_completed(task_id)
+                except ValueError:
+                    print("Invalid task ID!")
+            
+            elif choice == 4:  # Mark task as pending
+                todo_list.view_tasks("completed")
+                try:
+                    task_id = int(input("Enter task ID to mark as pending: "))
+                    todo_list.mark_pending(task_id)
+                except ValueError:
+                    print("Invalid task ID!")
+            
+            elif choice == 5:  # Remove task
+                todo_list.view_tasks()
+                try:
+                    task_id = int(input("Enter task ID to remove: "))
+                    todo_list.remove_task(task_id)
+                except ValueError:
+                    print("Invalid task ID!")
+            
+            elif choice == 6:  # Edit task
+                todo_list.view_tasks()
+                try:
+                    task_id = int(input("Enter task ID to edit: "))
+                    print("Leave blank to keep current value:")
+                    new_description = input("New description: ").strip()
+                    new_category = input("New category: ").strip()
+                    new_priority = input("New priority (High/Medium/Low): ").strip()
                 
-                new_due_date = None
-                change_due_date = input("Change due date? (y/n): ").strip().lower()
-                if change_due_date == 'y':
-                    try:
-                        date_str = input("Enter new due date (YYYY-MM-DD): ").strip()
-                        new_due_date = datetime.strptime(date_str, '%Y-%m-%d')
-                    except ValueError:
-                        print("Invalid date format. Keeping current due date.")
+                    new_due_date = None
+                    change_due_date = input("Change due date? (y/n): ").strip().lower()
+                    if change_due_date == 'y':
+                        try:
+                            date_str = input("Enter new due date (YYYY-MM-DD): ").strip()
+                            new_due_date = datetime.strptime(date_str, '%Y-%m-%d')
+                        except ValueError:
+                            print("Invalid date format. Keeping current due date.")
                 
-                # Only update if new values are provided
-                todo_list.edit_task(
-                    task_id,
-                    new_description if new_description else None,
-                    new_category if new_category else None,
-                    new_priority if new_priority else None,
-                    new_due_date
-                )
-            except ValueError:
-                print("Invalid task ID!")
-        
-        elif choice == 7:  # View completed tasks
-            todo_list.view_tasks("completed")
-        
-        elif choice == 8:  # View pending tasks
-            todo_list.view_tasks("pending")
-        
-        elif choice == 9:  # View tasks by category
-            category = input("Enter category to filter by (or 'all' for all categories): ").strip()
-            todo_list.view_tasks("all", category)
-        
-        elif choice == 10:  # Task statistics
-            todo_list.get_statistics()
-        
-        elif choice == 11:  # Clear completed tasks
-            confirm = input("Are you sure you want to clear all completed tasks? (y/n): ").strip().lower()
-            if confirm == 'y':
-                todo_list.clear_completed()
-        
-        elif choice == 12:  # Exit
-            print("Thank you for using the To-Do List Application!")
-            print("Your tasks have been saved automatically.")
-            break
+                    # Only update if new values are provided
+                    todo_list.edit_task(
+                        task_id,
+                        new_description if new_description else None,
+                        new_category if new_category else None,
+                        new_priority if new_priority else None,
+                        new_due_date
+                    )
+                except ValueError:
+                    print("Invalid task ID!")
+            
+            elif choice == 7:  # View completed tasks
+                todo_list.view_tasks("completed")
+            
+            elif choice == 8:  # View pending tasks
+                todo_list.view_tasks("pending")
+            
+            elif choice == 9:  # View tasks by category
+                category = input("Enter category to filter by (or 'all' for all categories): ").strip()
+                todo_list.view_tasks("all", category)
+            
+            elif choice == 10:  # Task statistics
+                todo_list.get_statistics()
+            
+            elif choice == 11:  # Clear completed tasks
+                confirm = input("Are you sure you want to clear all completed tasks? (y/n): ").strip().lower()
+                if confirm == 'y':
+                    todo_list.clear_completed()
+            
+            elif choice == 12:  # Exit
+                todo_list.close()
+                print("Thank you for using the To-Do List Application!")
+                print("Your tasks have been saved automatically.")
+                break
+            
+            else:
+                print("Invalid choice! Please enter a number between 1 and 12.")
         
-        else:
-            print("Invalid choice! Please enter a number between 1 and 12.")
+        except sqlite3.Error as e:
+            print(f"✗ Could not save the change: {e}")
         
         input("\nPress Enter to continue...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Per-page parse benchmark for headline extraction.
+
+For every channel in NEWS_CHANNELS it loads fixtures/<channel>.html and
+times extract_headlines three ways: the old path (html.parser, one
+soup.select per selector), one combined selector with each BeautifulSoup
+parser, and lxml streaming that stops at --max headlines. It checks that
+the two full parses find the same headlines.
+
+Channels without a fixture use a synthetic front page of similar size and
+shape (navigation, scripts, teaser grids). Run with --capture once (or
+`python replay.py record`) to save the live pages as fixtures.
+
+Usage: python bench_parse.py [--fixtures fixtures] [--max 10] [--repeat 5] [--capture]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from bs4 import BeautifulSoup
+
+from indian_news_scraper import IndianNewsScraper
+from replay import FIXTURES, load_fixtures, record
+
+
+def old_extract(scraper, html, selectors):
+    """The original path: html.parser, then one full-tree select per selector"""
+    soup = BeautifulSoup(html, 'html.parser')
+    headlines = []
+    for selector in selectors:
+        for element in soup.select(selector):
+            text = element.get_text().strip()
+            if scraper.is_valid_headline(text) and text not in headlines:
+                headlines.append(text)
+    return headlines
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--max', type=int, default=10, help="headlines wanted per page (streaming stops here)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--capture', action='store_true', help="download live pages into the fixtures directory")
+    args = parser.parse_args()
+
+    if args.capture:
+        record(args.fixtures)
+
+    scrapers = {
+        'html.parser': IndianNewsScraper(parser='html.parser'),
+        'lxml': IndianNewsScraper(parser='lxml'),
+        'stream': IndianNewsScraper(stream=True),
+    }
+    print(f"{'channel':<15} {'KB':>6} {'old ms':>8} {'html.parser':>12} {'lxml':>8} {'stream':>8}  source")
+    totals = [0.0] * 4
+    for key, (html, saved) in load_fixtures(args.fixtures).items():
+        selectors = IndianNewsScraper.NEWS_CHANNELS[key]['selectors']
+        with contextlib.redirect_stdout(io.StringIO()):
+            old, old_found = best_of(args.repeat, lambda: old_extract(scrapers['lxml'], html, selectors))
+            timings = [old]
+            found = {}
+            for name, scraper in scrapers.items():
+                limit = args.max if name == 'stream' else None
+                elapsed, found[name] = best_of(args.repeat, lambda: scraper.extract_headlines(html, selectors, limit))
+                timings.append(elapsed)
+        # Combined selectors return page order, the old path grouped by selector
+        assert sorted(found['lxml']) == sorted(old_found), key
+        totals = [total + elapsed for total, elapsed in zip(totals, timings)]
+        print(f"{key:<15} {len(html) / 1024:>6.0f} " + ' '.join(f"{t * 1000:>{w}.1f}" for t, w in zip(timings, (8, 12, 8, 8)))
+              + f"  {'fixture' if saved else 'synthetic'}")
+    print(f"{'total':<15} {'':>6} " + ' '.join(f"{t * 1000:>{w}.1f}" for t, w in zip(totals, (8, 12, 8, 8))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Sequential vs concurrent benchmark for IndianNewsScraper.
+
+Every channel in NEWS_CHANNELS gets its own local stub HTTP server (its own
+host:port, so the per-host rate limiter treats them as separate sites)
+serving a canned page of headlines after a configurable delay. The scraper
+is then pointed at the stubs and scrape_multiple_channels is timed with one
+worker and with N workers. The old loop slept a fixed 2 s after every
+channel; that floor is printed for comparison.
+
+The stubs gzip their pages and send an ETag, so each scraper then scrapes
+again: the "rescrape" column is the conditional GET that comes back 304
+and skips parsing. Bytes are what the stubs sent over the wire.
+
+Usage: python bench_scraper.py [--latency 0.2] [--workers 1 10] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from indian_news_scraper import IndianNewsScraper
+from replay import replay_channels
+
+
+def canned_page(name, count=30):
+    items = ''.join(f"<h2>{name} headline number {i}: markets, monsoon and more</h2>\n"
+                    f"<h3>{name} analysis {i} on the latest policy announcement</h3>\n"
+                    for i in range(count))
+    return f"<html><head><title>{name}</title></head><body><nav>Home</nav>{items}</body></html>".encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds each stub waits before answering")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = {key: canned_page(channel['name']) for key, channel in IndianNewsScraper.NEWS_CHANNELS.items()}
+    with replay_channels(pages, latency=args.latency) as (channels, servers):
+        run(args, channels, servers)
+
+
+def run(args, channels, servers):
+    print(f"{len(channels)} channels, {args.latency * 1000:.0f} ms per response")
+    print(f"old fixed-delay loop: >= {len(channels) * (2 + args.latency):.1f} s")
+    print(f"{'workers':>8} {'best s':>8} {'rescrape s':>11} {'headlines':>10} {'bytes':>8}")
+    for workers in args.workers:
+        best = best_again = float('inf')
+        for _ in range(args.repeat):
+            # A fresh scraper per run so the rate limiter and page cache start empty
+            scraper = IndianNewsScraper(workers=workers, min_interval=0, channels=channels)
+            sent_before = sum(server.bytes_sent for server in servers.values())
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                results = scraper.scrape_multiple_channels(list(channels), max_per_channel=10)
+                best = min(best, time.perf_counter() - start)
+                start = time.perf_counter()
+                again = scraper.scrape_multiple_channels(list(channels), max_per_channel=10)
+                best_again = min(best_again, time.perf_counter() - start)
+            scraper.close()
+            sent = sum(server.bytes_sent for server in servers.values()) - sent_before
+        assert again == results
+        headlines = sum(len(found) for found in results.values())
+        print(f"{workers:>8} {best:>8.3f} {best_again:>11.3f} {headlines:>10} {sent:>8}")
+
+
+if __name__ == '__main__':
+    main()
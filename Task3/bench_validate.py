@@ -0,0 +1,79 @@
+"""
+Micro-benchmark for headline validation.
+
+Candidates are every line of the saved indian_news_headlines_*.txt reports
+(numbering stripped): real headlines plus the report's banners and rules,
+padded with the navigation and footer texts a page yields, and repeated up
+to --count strings. It times the old is_valid_headline (a fresh word list,
+lower() and eight substring scans per call), HeadlineFilter.is_valid per
+string and HeadlineFilter.filter over the whole batch, and checks all
+three agree.
+
+Usage: python bench_validate.py [--count 20000] [--repeat 5]
+"""
+import argparse
+import glob
+import os
+import re
+import time
+
+from indian_news_scraper import HeadlineFilter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NUMBERING = re.compile(r'^\s*\d+\.\s+')
+PAGE_NOISE = ["Home", "About Us", "Contact Us", "Login", "Sign Up for our newsletter today", "Menu",
+              "Search results for the latest news", "Follow us on Twitter and Instagram",
+              "Trending", "Live TV", "Subscribe to our daily newsletter and get updates"]
+
+
+def old_is_valid_headline(text):
+    if len(text) < 20 or len(text) > 200:
+        return False
+    exclude_words = ['home', 'about', 'contact', 'login', 'sign up', 'menu', 'search', 'follow us']
+    text_lower = text.lower()
+    if any(word in text_lower for word in exclude_words):
+        return False
+    return True
+
+
+def candidates(count):
+    texts = list(PAGE_NOISE)
+    for path in sorted(glob.glob(os.path.join(HERE, 'indian_news_headlines_*.txt'))):
+        with open(path, encoding='utf-8') as file:
+            texts.extend(NUMBERING.sub('', line).strip() for line in file if line.strip())
+    return (texts * (count // len(texts) + 1))[:count]
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = candidates(args.count)
+    headline_filter = HeadlineFilter()
+    runs = [
+        ("old is_valid_headline", lambda: [text for text in texts if old_is_valid_headline(text)]),
+        ("HeadlineFilter.is_valid", lambda: [text for text in texts if headline_filter.is_valid(text)]),
+        ("HeadlineFilter.filter", lambda: headline_filter.filter(texts)),
+    ]
+    print(f"{len(texts)} candidates")
+    expected = None
+    for name, run in runs:
+        elapsed, valid = best_of(args.repeat, run)
+        assert expected is None or valid == expected, name
+        expected = valid
+        print(f"{name:<24} {elapsed * 1000:>8.2f} ms  {elapsed / len(texts) * 1e9:>6.0f} ns/string  {len(valid)} valid")
+
+
+if __name__ == '__main__':
+    main()
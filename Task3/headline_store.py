@@ -0,0 +1,164 @@
+"""
+Persistent record of headlines the scraper has already reported.
+
+HeadlineStore keeps one row per normalized headline in SQLite, keyed by a
+64-bit hash of its text, so a repeat is found with a single primary-key
+lookup. Each row also carries a MinHash signature of the headline's
+character shingles, split into bands that are indexed separately: two
+headlines worded slightly differently (on one channel or across channels)
+share at least one band bucket with high probability and are then compared
+signature to signature.
+
+Rows not seen for `ttl` seconds are evicted, and the table is capped at
+`max_entries` rows (least recently seen go first), so the file stays small
+however long the scraper runs.
+"""
+import hashlib
+import random
+import re
+import sqlite3
+import time
+from array import array
+
+NUM_PERM = 32               # MinHash values per headline
+BANDS = 8                   # LSH bands of NUM_PERM // BANDS values each
+SHINGLE = 4                 # characters per shingle
+PRIME = (1 << 61) - 1
+# Fixed seed: signatures must mean the same thing in every run
+_rng = random.Random(20250925)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(NUM_PERM)]
+
+NON_WORD = re.compile(r'[^\w ]+')
+SPACES = re.compile(r'\s+')
+
+
+def normalize(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return SPACES.sub(' ', NON_WORD.sub(' ', text.lower())).strip()
+
+
+def hash64(data):
+    """Stable signed 64-bit hash (fits an SQLite INTEGER)"""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big', signed=True)
+
+
+def minhash(text):
+    """MinHash signature of a normalized text's character shingles"""
+    shingles = {text[i:i + SHINGLE] for i in range(max(1, len(text) - SHINGLE + 1))}
+    hashes = [hash64(shingle.encode()) & PRIME for shingle in shingles]
+    return array('Q', (min((a * h + b) % PRIME for h in hashes) for a, b in PERMUTATIONS))
+
+
+def band_buckets(signature):
+    """(band, bucket) pairs: each band's slice of the signature hashed to one integer"""
+    rows = NUM_PERM // BANDS
+    return [(band, hash64(signature[band * rows:(band + 1) * rows].tobytes())) for band in range(BANDS)]
+
+
+class HeadlineStore:
+    """
+    Seen-headline index backed by an SQLite file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS headlines (
+            hash INTEGER PRIMARY KEY,
+            channel TEXT NOT NULL,
+            signature BLOB NOT NULL,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS headlines_last_seen ON headlines (last_seen);
+        CREATE TABLE IF NOT EXISTS bands (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            hash INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, hash)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS bands_hash ON bands (hash);
+    """
+
+    def __init__(self, filename="seen_headlines.db", ttl=30 * 86400, max_entries=200_000, similarity=0.6):
+        """
+        ttl: seconds a headline is remembered after it was last seen
+        max_entries: most headlines kept, least recently seen evicted first
+        similarity: estimated Jaccard similarity at which two headlines count as one
+        """
+        self.filename = filename
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM headlines").fetchone()[0]
+
+    def _near_duplicate(self, signature, buckets):
+        """Hash of a stored headline similar enough to this signature, or None"""
+        candidates = set()
+        for band, bucket in buckets:
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT hash FROM bands WHERE band = ? AND bucket = ?", (band, bucket)))
+        for key in candidates:
+            row = self.conn.execute("SELECT signature FROM headlines WHERE hash = ?", (key,)).fetchone()
+            if row is None:
+                continue
+            stored = array('Q')
+            stored.frombytes(row[0])
+            if sum(x == y for x, y in zip(signature, stored)) >= self.similarity * NUM_PERM:
+                return key
+        return None
+
+    def filter_new(self, channel, headlines, now=None):
+        """
+        Record headlines seen on a channel and return the ones not seen
+        before, on any channel, either verbatim or as a near-duplicate
+        """
+        now = time.time() if now is None else now
+        new = []
+        with self.conn:
+            self._expire(now)
+            for headline in headlines:
+                text = normalize(headline)
+                key = hash64(text.encode())
+                if self.conn.execute("UPDATE headlines SET last_seen = ? WHERE hash = ?", (now, key)).rowcount:
+                    continue
+                signature = minhash(text)
+                buckets = band_buckets(signature)
+                match = self._near_duplicate(signature, buckets)
+                if match is not None:
+                    self.conn.execute("UPDATE headlines SET last_seen = ? WHERE hash = ?", (now, match))
+                else:
+                    new.append(headline)
+                # Remember this wording too, so seeing it again is a primary-key hit
+                self.conn.execute("INSERT INTO headlines VALUES (?, ?, ?, ?, ?)",
+                                  (key, channel, signature.tobytes(), now, now))
+                self.conn.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?, ?)",
+                                      [(band, bucket, key) for band, bucket in buckets])
+        return new
+
+    def expire(self, now=None):
+        """Forget headlines past their TTL, then the oldest beyond max_entries"""
+        with self.conn:
+            return self._expire(time.time() if now is None else now)
+
+    def _expire(self, now):
+        stale = [row[0] for row in self.conn.execute(
+            "SELECT hash FROM headlines WHERE last_seen < ?", (now - self.ttl,))]
+        excess = len(self) - len(stale) - self.max_entries
+        if excess > 0:
+            stale += [row[0] for row in self.conn.execute(
+                "SELECT hash FROM headlines WHERE last_seen >= ? ORDER BY last_seen LIMIT ?",
+                (now - self.ttl, excess))]
+        for start in range(0, len(stale), 500):
+            chunk = stale[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            self.conn.execute(f"DELETE FROM bands WHERE hash IN ({placeholders})", chunk)
+            self.conn.execute(f"DELETE FROM headlines WHERE hash IN ({placeholders})", chunk)
+        return len(stale)
@@ -1,7 +1,87 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import argparse
+import contextlib
 import datetime
+import heapq
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from headline_store import HeadlineStore
+from sinks import open_sink
+
+try:
+    from lxml import etree
+except ImportError:     # fall back to the pure-Python parser
+    etree = None
+
+DEFAULT_PARSER = 'lxml' if etree is not None else 'html.parser'
+# Selectors the streaming parser can match on its own: a tag name or a single class
+SIMPLE_SELECTOR = re.compile(r'\.?[\w-]+')
+# Navigation, footer links, etc. that are never headlines
+EXCLUDE_WORDS = ('home', 'about', 'contact', 'login', 'sign up', 'menu', 'search', 'follow us')
+
+class HeadlineFilter:
+    """
+    Precompiled headline validator: a length window plus the excluded words,
+    lowercased once up front. Each candidate is lowercased once and scanned
+    for each word with str's C substring search, which beats a regex
+    alternation at this list size.
+    """
+    
+    def __init__(self, exclude_words=EXCLUDE_WORDS, min_length=20, max_length=200):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.exclude_words = tuple(dict.fromkeys(word.lower() for word in exclude_words))
+    
+    def _clean(self, text_lower):
+        for word in self.exclude_words:
+            if word in text_lower:
+                return False
+        return True
+    
+    def is_valid(self, text):
+        """
+        Validate if the text is a proper headline
+        """
+        return self.min_length <= len(text) <= self.max_length and self._clean(text.lower())
+    
+    def filter(self, texts):
+        """
+        Return the valid headlines among texts, in order
+        """
+        low, high, clean = self.min_length, self.max_length, self._clean
+        return [text for text in texts if low <= len(text) <= high and clean(text.lower())]
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host by at least min_interval seconds.
+    Requests to different hosts never wait for each other.
+    """
+    
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self.next_slot = {}     # host -> earliest time its next request may start
+        self.lock = threading.Lock()
+    
+    def wait(self, url):
+        """
+        Block until a request to url's host is allowed
+        """
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            # Reserve the slot before sleeping so concurrent callers queue up behind it
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
 
 class IndianNewsScraper:
     """
@@ -62,12 +142,80 @@ class IndianNewsScraper:
         }
     }
 
-    def __init__(self):
+    # Optional callback(stage, seconds) for instrumentation; stages are
+    # fetch, parse, select, validate and dedup (may be called from worker threads)
+    observe = None
+
+    TIMEOUT = (5, 15)       # seconds to connect, seconds between bytes of the response
+    RETRIES = 3             # retries on connection errors and 5xx, with exponential backoff
+
+    def __init__(self, workers=8, min_interval=2.0, channels=None, parser=DEFAULT_PARSER, stream=False,
+                 seen_store=None):
+        """
+        workers: channels fetched at once by scrape_multiple_channels
+        min_interval: seconds between two requests to the same host
+        channels: replaces NEWS_CHANNELS for this scraper (e.g. local test servers)
+        parser: BeautifulSoup tree builder ('lxml', 'html.parser', ...)
+        stream: parse incrementally with lxml and stop at max_headlines headlines
+        seen_store: a HeadlineStore; scrape_multiple_channels then returns only new headlines
+        """
+        if channels is not None:
+            self.NEWS_CHANNELS = channels
+        if stream and etree is None:
+            raise ValueError("stream=True needs lxml")
+        self.workers = workers
+        self.parser = parser
+        self.stream = stream
+        self.seen_store = seen_store
+        self.rate_limiter = HostRateLimiter(min_interval)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            # Every encoding urllib3 can decode here (br needs the brotli package)
+            'Accept-Encoding': ACCEPT_ENCODING
         }
+        self.headline_filter = HeadlineFilter()
+        self.channel_filters = {}   # channel key -> HeadlineFilter, for channels with their own exclude_words
+        # url -> (ETag, Last-Modified, headlines found, whether the whole page was read)
+        self.page_cache = {}
+        self.session = self.create_session()
+
+    def create_session(self):
+        """
+        One keep-alive session shared by all workers, so repeat scrapes reuse connections
+        """
+        session = requests.Session()
+        session.headers.update(self.headers)
+        retry = Retry(total=self.RETRIES, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504],
+                      allowed_methods=['GET'], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=len(self.NEWS_CHANNELS), pool_maxsize=self.workers,
+                              max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @contextlib.contextmanager
+    def timed(self, stage):
+        """
+        Report the block's run time to `observe`, if one is set
+        """
+        if self.observe is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def close(self):
+        """
+        Close the pooled connections and the seen-headline store
+        """
+        self.session.close()
+        if self.seen_store is not None:
+            self.seen_store.close()
 
     def scrape_channel(self, channel_key, max_headlines=15):
         """
@@ -81,28 +229,32 @@ class IndianNewsScraper:
         print(f"Scraping headlines from {channel['name']}...")
         
         try:
-            response = requests.get(channel['url'], headers=self.headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            headlines = []
+            url = channel['url']
+            cached = self.page_cache.get(url)
+            conditional = {}
+            # A page that was only partly read cannot answer for more headlines than it gave
+            if cached and (cached[3] or len(cached[2]) >= max_headlines):
+                etag, last_modified = cached[:2]
+                if etag:
+                    conditional['If-None-Match'] = etag
+                if last_modified:
+                    conditional['If-Modified-Since'] = last_modified
             
-            # Try different selectors to find headlines
-            for selector in channel['selectors']:
-                elements = soup.select(selector)
-                for element in elements:
-                    text = element.get_text().strip()
-                    if self.is_valid_headline(text):
-                        headlines.append(text)
+            self.rate_limiter.wait(url)
+            with self.timed('fetch'):
+                response = self.session.get(url, headers=conditional, timeout=self.TIMEOUT)
+            if response.status_code == 304 and conditional:
+                # Unchanged since the last scrape: nothing to download or parse
+                return cached[2][:max_headlines]
+            response.raise_for_status()
             
-            # Remove duplicates while preserving order
-            unique_headlines = []
-            seen = set()
-            for headline in headlines:
-                if headline not in seen:
-                    seen.add(headline)
-                    unique_headlines.append(headline)
+            limit = max_headlines if self.stream else None
+            unique_headlines = self.extract_headlines(response.content, channel['selectors'], limit,
+                                                      self.filter_for(channel_key), self.page_encoding(response))
             
+            if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+                self.page_cache[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                        unique_headlines, limit is None or len(unique_headlines) < limit)
             return unique_headlines[:max_headlines]
             
         except requests.exceptions.RequestException as e:
@@ -112,22 +264,90 @@ class IndianNewsScraper:
             print(f"Error parsing {channel['name']}: {e}")
             return []
 
-    def is_valid_headline(self, text):
+    def filter_for(self, channel_key):
         """
-        Validate if the text is a proper headline
+        The HeadlineFilter for a channel: the default one, or one that also
+        excludes the channel's own 'exclude_words'
+        """
+        extra = self.NEWS_CHANNELS.get(channel_key, {}).get('exclude_words')
+        if not extra:
+            return self.headline_filter
+        if channel_key not in self.channel_filters:
+            self.channel_filters[channel_key] = HeadlineFilter((*EXCLUDE_WORDS, *extra))
+        return self.channel_filters[channel_key]
+
+    @staticmethod
+    def page_encoding(response):
+        """
+        The charset to decode a page with: the one the Content-Type header
+        names, else None to let the parser read the page's <meta> tag, else
+        (the page declares nothing) the encoding guessed from its bytes.
+        requests' ISO-8859-1 default for text/* does not count as named.
+        """
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            return response.encoding
+        if b'charset' in response.content[:4096].lower():
+            return None
+        return response.apparent_encoding
+
+    def extract_headlines(self, html, selectors, limit=None, headline_filter=None, encoding=None):
         """
-        # Filter out short texts, navigation items, etc.
-        if len(text) < 20 or len(text) > 200:
-            return False
+        Return the unique valid headlines in a page, in page order, stopping
+        once `limit` of them have been found. `encoding` decodes a page given
+        as bytes; without it the parser detects the encoding itself.
+        """
+        headline_filter = headline_filter or self.headline_filter
+        if not (self.stream and all(SIMPLE_SELECTOR.fullmatch(selector) for selector in selectors)):
+            # One pass over the tree for all of the channel's selectors, one batch validation
+            with self.timed('parse'):
+                soup = BeautifulSoup(html, self.parser, from_encoding=encoding if isinstance(html, bytes) else None)
+            with self.timed('select'):
+                texts = [element.get_text().strip() for element in soup.select(', '.join(selectors))]
+            with self.timed('dedup'):
+                texts = dict.fromkeys(texts)
+            with self.timed('validate'):
+                return headline_filter.filter(texts)[:limit]
         
-        # Common words to exclude (navigation, footer links, etc.)
-        exclude_words = ['home', 'about', 'contact', 'login', 'sign up', 'menu', 'search', 'follow us']
-        text_lower = text.lower()
+        headlines = []
+        seen = set()
+        # Streaming interleaves every stage; it is all reported as parsing
+        with self.timed('parse'):
+            for text in self.stream_texts(html, selectors, encoding=encoding):
+                if text not in seen and headline_filter.is_valid(text):
+                    seen.add(text)
+                    headlines.append(text)
+                    if limit is not None and len(headlines) >= limit:
+                        break
+        return headlines
+
+    @staticmethod
+    def stream_texts(html, selectors, chunk_size=16384, encoding=None):
+        """
+        Feed the page to lxml in chunks and yield the text of each element
+        matching a tag or class selector as soon as it is closed. Bytes are
+        decoded as `encoding` when given (lxml otherwise only sees a <meta>
+        charset, not the HTTP header's).
+        """
+        tags = {selector.lower() for selector in selectors if not selector.startswith('.')}
+        classes = {selector[1:] for selector in selectors if selector.startswith('.')}
+        parser = etree.HTMLPullParser(events=('end',), encoding=encoding if isinstance(html, bytes) else None)
         
-        if any(word in text_lower for word in exclude_words):
-            return False
-            
-        return True
+        def matches():
+            for _, element in parser.read_events():
+                if element.tag in tags or not classes.isdisjoint((element.get('class') or '').split()):
+                    yield ''.join(element.itertext()).strip()
+        
+        for start in range(0, len(html), chunk_size):
+            parser.feed(html[start:start + chunk_size])
+            yield from matches()
+        parser.close()
+        yield from matches()
+
+    def is_valid_headline(self, text):
+        """
+        Validate if the text is a proper headline
+        """
+        return self.headline_filter.is_valid(text)
 
     def list_channels(self):
         """
@@ -139,20 +359,97 @@ class IndianNewsScraper:
             print(f"{key:15} - {channel['name']}")
         print()
 
-    def scrape_multiple_channels(self, channel_keys, max_per_channel=10):
+    def scrape_multiple_channels(self, channel_keys, max_per_channel=10, workers=None):
         """
-        Scrape headlines from multiple channels
+        Scrape headlines from multiple channels, up to `workers` at a time
+        (default: the scraper's worker count; 1 fetches them one by one).
+        Politeness comes from the per-host rate limiter, not a fixed delay.
+        With a seen_store, headlines reported by an earlier run (or already
+        by another channel in this one) are left out.
         """
-        all_headlines = {}
+        channel_keys = [key for key in dict.fromkeys(channel_keys) if key in self.NEWS_CHANNELS]
+        if not channel_keys:
+            return {}
         
-        for channel_key in channel_keys:
-            if channel_key in self.NEWS_CHANNELS:
-                headlines = self.scrape_channel(channel_key, max_per_channel)
-                all_headlines[channel_key] = headlines
-                time.sleep(2)  # Be polite - delay between requests
-            
+        workers = max(1, min(workers or self.workers, len(channel_keys)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda key: self.scrape_channel(key, max_per_channel), channel_keys)
+            # Keep the order the channels were asked for
+            all_headlines = dict(zip(channel_keys, results))
+        
+        if self.seen_store is not None:
+            with self.timed('dedup'):
+                for key, headlines in all_headlines.items():
+                    all_headlines[key] = self.seen_store.filter_new(key, headlines)
         return all_headlines
 
+class ScrapeDaemon:
+    """
+    Scrapes each channel on its own timer and writes new headlines to a sink.
+    
+    A channel starts at its 'interval' entry in NEWS_CHANNELS (or the default
+    interval). A poll that finds new headlines halves its interval; one that
+    finds none stretches it by half. Intervals stay within
+    [min_interval, max_interval]. Channels that fall due together are
+    scraped concurrently.
+    """
+    
+    def __init__(self, scraper, sink, channel_keys=None, interval=300, min_interval=60, max_interval=3600,
+                 max_per_channel=30):
+        if scraper.seen_store is None:
+            raise ValueError("the daemon needs a scraper with a seen_store to tell new headlines apart")
+        self.scraper = scraper
+        self.sink = sink
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_per_channel = max_per_channel
+        keys = channel_keys or list(scraper.NEWS_CHANNELS)
+        self.intervals = {key: scraper.NEWS_CHANNELS[key].get('interval', interval)
+                          for key in keys if key in scraper.NEWS_CHANNELS}
+        self.stop_event = threading.Event()
+    
+    def stop(self):
+        """
+        Make run() return after the current poll
+        """
+        self.stop_event.set()
+    
+    def poll(self, channel_keys):
+        """
+        Scrape these channels once, write their new headlines and adapt
+        their intervals; returns the records written
+        """
+        results = self.scraper.scrape_multiple_channels(channel_keys, self.max_per_channel)
+        scraped_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+        records = []
+        for key, headlines in results.items():
+            channel = self.scraper.NEWS_CHANNELS[key]
+            records.extend({'channel': key, 'name': channel['name'], 'headline': headline,
+                            'url': channel['url'], 'scraped_at': scraped_at} for headline in headlines)
+            interval = self.intervals[key] / 2 if headlines else self.intervals[key] * 1.5
+            self.intervals[key] = min(self.max_interval, max(self.min_interval, interval))
+            print(f"[{scraped_at}] {channel['name']}: {len(headlines)} new, next poll in {self.intervals[key]:.0f}s")
+        if records:
+            self.sink.write(records)
+        return records
+    
+    def run(self):
+        """
+        Poll until stop() is called (or Ctrl+C)
+        """
+        queue = [(time.monotonic(), key) for key in self.intervals]
+        heapq.heapify(queue)
+        while queue:
+            if self.stop_event.wait(max(0, queue[0][0] - time.monotonic())):
+                break
+            now = time.monotonic()
+            due = []
+            while queue and queue[0][0] <= now:
+                due.append(heapq.heappop(queue)[1])
+            self.poll(due)
+            for key in due:
+                heapq.heappush(queue, (time.monotonic() + self.intervals[key], key))
+
 def save_headlines(headlines_data, filename=None):
     """
     Save headlines to a text file
@@ -177,7 +474,7 @@ def save_headlines(headlines_data, filename=None):
                     for i, headline in enumerate(headlines, 1):
                         file.write(f"{i:2d}. {headline}\n")
                 else:
-                    file.write("No headlines found (website structure may have changed)\n")
+                    file.write("No new headlines (or the website structure may have changed)\n")
                 
                 file.write("\n")
         
@@ -205,16 +502,49 @@ def display_headlines(headlines_data):
             for i, headline in enumerate(headlines, 1):
                 print(f"{i:2d}. {headline}")
         else:
-            print("No headlines found (website structure may have changed)")
+            print("No new headlines (or the website structure may have changed)")
         
         print()
 
-def main():
+def run_daemon(args):
+    """
+    Scrape continuously into a structured sink until interrupted
+    """
+    channel_keys = [key.strip() for key in args.channels.split(',')] if args.channels else None
+    scraper = IndianNewsScraper(seen_store=HeadlineStore(args.seen))
+    sink = open_sink(args.sink)
+    daemon = ScrapeDaemon(scraper, sink, channel_keys, args.interval, args.min_interval, args.max_interval)
+    print(f"Scraping {len(daemon.intervals)} channels into {args.sink} (Ctrl+C to stop)")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print("\nStopping.")
+    finally:
+        scraper.close()
+        sink.close()
+
+def main(argv=None):
     """
     Main function to run the Indian news scraper
     """
+    parser = argparse.ArgumentParser(description="Scrape headlines from Indian news channels")
+    parser.add_argument('--daemon', action='store_true',
+                        help="keep scraping on a schedule instead of one interactive run")
+    parser.add_argument('--sink', default="headlines.ndjson",
+                        help="daemon output: .db/.sqlite for SQLite, anything else NDJSON (default: %(default)s)")
+    parser.add_argument('--channels', help="comma-separated channel keys for the daemon (default: all)")
+    parser.add_argument('--interval', type=float, default=300, help="starting seconds between polls of a channel")
+    parser.add_argument('--min-interval', type=float, default=60)
+    parser.add_argument('--max-interval', type=float, default=3600)
+    parser.add_argument('--seen', default="seen_headlines.db", help="seen-headline database")
+    args = parser.parse_args(argv)
+    
+    if args.daemon:
+        run_daemon(args)
+        return
+    
     global scraper
-    scraper = IndianNewsScraper()
+    scraper = IndianNewsScraper(seen_store=HeadlineStore(args.seen))
     
     print("INDIAN NEWS CHANNELS SCRAPER")
     print("=" * 40)
@@ -246,6 +576,11 @@ def main():
     
     # Scrape headlines
     headlines_data = scraper.scrape_multiple_channels(valid_channels, max_per_channel=10)
+    scraper.close()
+    
+    if not any(headlines_data.values()):
+        print("No new headlines since the last run.")
+        return
     
     # Display results
     display_headlines(headlines_data)
@@ -255,7 +590,7 @@ def main():
     
     if filename:
         total_headlines = sum(len(headlines) for headlines in headlines_data.values())
-        print(f"\nSuccessfully extracted {total_headlines} headlines from {len(valid_channels)} channels!")
+        print(f"\nSuccessfully extracted {total_headlines} new headlines from {len(valid_channels)} channels!")
         print(f"Results saved to: {filename}")
     else:
         print("Failed to save headlines to file.")
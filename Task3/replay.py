@@ -0,0 +1,259 @@
+"""
+Record/replay harness for the news scraper.
+
+    python replay.py record [--fixtures fixtures]
+        Save each NEWS_CHANNELS page, as the live site serves it, to
+        fixtures/<channel>.html.
+
+    python replay.py bench [--rounds 5] [--workers 10] [--latency 0.1]
+                           [--fail-rate 0.05] [--drop-rate 0.02] [--stream]
+        Serve the fixtures (a synthetic front page for any channel without
+        one) from local servers, one port per channel so the per-host rate
+        limiter treats them as separate sites. Responses are delayed by
+        --latency. A --fail-rate share of them are 503s and a --drop-rate
+        share close the connection unanswered, which exercises the
+        scraper's retries. The scraper scrapes every channel --rounds times
+        through a fresh seen-headline store. The report gives end-to-end
+        throughput, time per stage (fetch, parse, select, validate, dedup)
+        from the scraper's observe hook, and peak traced memory from one
+        extra round under tracemalloc.
+
+No network access is needed after recording, so concurrency and parser
+changes can be compared run to run.
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from headline_store import HeadlineStore
+from indian_news_scraper import IndianNewsScraper
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, 'fixtures')
+STAGES = ('fetch', 'parse', 'select', 'validate', 'dedup')
+
+
+def synthetic_page(channel, stories=400, seed=0):
+    """A front page of roughly 200 KB with headlines under the channel's selectors"""
+    rng = random.Random(seed)
+    words = ("government minister court election market monsoon cricket budget state police "
+             "report city rally policy farmers rupee temple railway summit startup").split()
+    classes = [selector[1:] for selector in channel['selectors'] if selector.startswith('.')] or ['title']
+    parts = ["<html><head><title>", channel['name'], "</title>",
+             "<script>", "var config = {};" * 2000, "</script></head><body>",
+             "<nav>", ''.join(f'<a href="/section/{i}">Section {i}</a>' for i in range(80)), "</nav>"]
+    for i in range(stories):
+        headline = ' '.join(rng.choice(words) for _ in range(rng.randint(5, 12))).capitalize()
+        if i % 4 == 0:
+            tag = f"<h2><a href='/story/{i}'>{headline}</a></h2>"
+        elif i % 4 == 1:
+            tag = f"<h3>{headline}</h3>"
+        else:
+            tag = f"<div class='{rng.choice(classes)}'><a href='/story/{i}'>{headline}</a></div>"
+        parts.append(f"<div class='card'><img src='/img/{i}.jpg' alt=''>{tag}"
+                     f"<p class='summary'>{' '.join(rng.choice(words) for _ in range(30))}</p></div>")
+    parts.append("<footer>" + ''.join(f'<a href="/f/{i}">About us {i}</a>' for i in range(60)) + "</footer></body></html>")
+    return ''.join(parts).encode()
+
+
+def load_fixtures(directory=FIXTURES):
+    """channel key -> (page bytes, whether it is a recorded fixture)"""
+    pages = {}
+    for index, (key, channel) in enumerate(IndianNewsScraper.NEWS_CHANNELS.items()):
+        path = os.path.join(directory, f"{key}.html")
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                pages[key] = (file.read(), True)
+        else:
+            pages[key] = (synthetic_page(channel, seed=index), False)
+    return pages
+
+
+def record(directory=FIXTURES):
+    """Save each channel's live page as a fixture"""
+    os.makedirs(directory, exist_ok=True)
+    scraper = IndianNewsScraper()
+    for key, channel in scraper.NEWS_CHANNELS.items():
+        try:
+            response = scraper.session.get(channel['url'], timeout=scraper.TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"{key}: {e}")
+            continue
+        with open(os.path.join(directory, f"{key}.html"), 'wb') as file:
+            file.write(response.content)
+        print(f"{key}: {len(response.content)} bytes")
+    scraper.close()
+
+
+class ReplayServer:
+    """
+    Serves one page on a free local port from a background thread.
+
+    The page is gzipped for clients that accept it and carries an ETag
+    (a matching If-None-Match gets a 304 when `conditional` is on).
+    Every response waits `latency` seconds. A `fail_rate` share of requests
+    get a 503 and a `drop_rate` share are closed without a response.
+    """
+
+    def __init__(self, page, latency=0.0, fail_rate=0.0, drop_rate=0.0, conditional=True, seed=None):
+        self.requests = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        rng = random.Random(seed)
+        etag = f'"{hash(page) & 0xffffffff:08x}"'
+        compressed = gzip.compress(page)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'     # keep-alive
+
+            def do_GET(self):
+                time.sleep(latency)
+                with server.lock:
+                    server.requests += 1
+                    roll = rng.random()
+                    if roll < fail_rate + drop_rate:
+                        server.failures += 1
+                if roll < drop_rate:
+                    self.close_connection = True
+                    return
+                if roll < fail_rate + drop_rate:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if conditional and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                body = compressed if 'gzip' in self.headers.get('Accept-Encoding', '') else page
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('ETag', etag)
+                if body is compressed:
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server.lock:
+                    server.bytes_sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@contextlib.contextmanager
+def replay_channels(pages, **options):
+    """Start a ReplayServer per page; yields (channels pointing at them, servers)"""
+    servers = {}
+    channels = {}
+    try:
+        for index, (key, page) in enumerate(pages.items()):
+            servers[key] = ReplayServer(page, seed=index, **options)
+            channels[key] = dict(IndianNewsScraper.NEWS_CHANNELS[key], url=servers[key].url)
+        yield channels, servers
+    finally:
+        for server in servers.values():
+            server.shutdown()
+
+
+class StageTimer:
+    """observe callback that sums seconds per stage across threads"""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self.lock = threading.Lock()
+
+    def __call__(self, stage, seconds):
+        with self.lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+
+def bench(args):
+    fixtures = load_fixtures(args.fixtures)
+    recorded = sum(saved for _, saved in fixtures.values())
+    pages = {key: page for key, (page, _) in fixtures.items()}
+    print(f"{len(pages)} channels ({recorded} recorded, {len(pages) - recorded} synthetic), "
+          f"{args.latency * 1000:.0f} ms latency, {args.fail_rate:.0%} 503s, {args.drop_rate:.0%} dropped")
+
+    with replay_channels(pages, latency=args.latency, fail_rate=args.fail_rate, drop_rate=args.drop_rate,
+                         conditional=args.conditional) as (channels, servers), \
+            tempfile.TemporaryDirectory() as tmp:
+        scraper = IndianNewsScraper(workers=args.workers, min_interval=0, channels=channels, stream=args.stream,
+                                    seen_store=HeadlineStore(os.path.join(tmp, 'seen.db')))
+        timer = StageTimer()
+        scraper.observe = timer
+        found = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(args.rounds):
+                results = scraper.scrape_multiple_channels(list(channels), args.max)
+                found += sum(len(headlines) for headlines in results.values())
+        elapsed = time.perf_counter() - start
+
+        # One more round under tracemalloc, kept out of the timings
+        scraper.observe = None
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape_multiple_channels(list(channels), args.max)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        scraper.close()
+
+        pages_scraped = args.rounds * len(channels)
+        print(f"{args.rounds} rounds in {elapsed:.2f} s: {pages_scraped / elapsed:.1f} pages/s, "
+              f"{found} new headlines")
+        print(f"requests {sum(s.requests for s in servers.values())}, "
+              f"injected failures {sum(s.failures for s in servers.values())}, "
+              f"{sum(s.bytes_sent for s in servers.values()) / 1024:.0f} KB sent")
+        # Stage times are summed over worker threads, so they can exceed the wall clock
+        print(f"{'stage':<10} {'total s':>9} {'ms/page':>9}")
+        for stage, seconds in timer.totals.items():
+            print(f"{stage:<10} {seconds:>9.3f} {seconds / pages_scraped * 1000:>9.2f}")
+        print(f"peak traced memory for one round: {peak / 1024 / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="save live pages as fixtures")
+    record_parser.add_argument('--fixtures', default=FIXTURES)
+    bench_parser = commands.add_parser('bench', help="scrape the fixtures from local servers")
+    bench_parser.add_argument('--fixtures', default=FIXTURES)
+    bench_parser.add_argument('--rounds', type=int, default=5)
+    bench_parser.add_argument('--workers', type=int, default=10)
+    bench_parser.add_argument('--max', type=int, default=10, help="headlines per channel")
+    bench_parser.add_argument('--latency', type=float, default=0.1, help="seconds before each response")
+    bench_parser.add_argument('--fail-rate', type=float, default=0.0, help="share of requests answered 503")
+    bench_parser.add_argument('--drop-rate', type=float, default=0.0, help="share of connections dropped")
+    bench_parser.add_argument('--conditional', action='store_true', help="answer repeat requests with 304")
+    bench_parser.add_argument('--stream', action='store_true', help="use the streaming parser")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.fixtures)
+    else:
+        bench(args)
+
+
+if __name__ == '__main__':
+    main()
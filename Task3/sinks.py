@@ -0,0 +1,72 @@
+"""
+Structured outputs for scraped headlines.
+
+A sink takes records, dicts with the keys in RECORD_FIELDS, and appends
+them somewhere a downstream consumer can read them incrementally:
+NdjsonSink writes one JSON object per line (tail the file), SQLiteSink
+inserts rows with an increasing id (select WHERE id > last id seen).
+"""
+import json
+import os
+import sqlite3
+
+RECORD_FIELDS = ('channel', 'name', 'headline', 'url', 'scraped_at')
+
+
+class NdjsonSink:
+    """
+    Append-only newline-delimited JSON file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'a', encoding='utf-8')
+
+    def write(self, records):
+        # One write per batch, so a reader never sees half a poll's lines for long
+        self.file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class SQLiteSink:
+    """
+    Headlines table in an SQLite database
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS headlines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel TEXT NOT NULL,
+            name TEXT NOT NULL,
+            headline TEXT NOT NULL,
+            url TEXT NOT NULL,
+            scraped_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS headlines_channel ON headlines (channel, scraped_at);
+        CREATE INDEX IF NOT EXISTS headlines_scraped_at ON headlines (scraped_at);
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def write(self, records):
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO headlines ({', '.join(RECORD_FIELDS)}) VALUES ({', '.join('?' * len(RECORD_FIELDS))})",
+                [[record[field] for field in RECORD_FIELDS] for record in records])
+
+    def close(self):
+        self.conn.close()
+
+
+def open_sink(path):
+    """SQLiteSink for .db/.sqlite/.sqlite3 paths, NdjsonSink for anything else"""
+    if os.path.splitext(path)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteSink(path)
+    return NdjsonSink(path)
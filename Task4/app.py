@@ -1,105 +1,255 @@
-from flask import Flask, request, jsonify
+import json
+import os
+import time
+
+from flask import Flask, Response, request, jsonify
+
+import handlers
+from cache import ResponseCache
+from metrics import Metrics
+from storage import EmailExistsError, create_store
 
 app = Flask(__name__)
 
-# In-memory storage for users
-users = {}
-user_id_counter = 1
+# User storage backend, selected with USER_STORE=memory|sqlite (and USER_DB)
+store = create_store()
+
+MAX_BULK_ITEMS = 100000
+
+# Request metrics, exported at /metrics (METRICS_ENABLED=0 turns them off)
+metrics = Metrics(enabled=os.environ.get('METRICS_ENABLED', '1') != '0')
+if metrics.enabled:
+    store.observe = metrics.observe_timing
+
+# Serialized GET responses, invalidated on every write (0 disables caching)
+response_cache = ResponseCache(max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', 1024)))
+
+def cached_json(build):
+    """
+    Serve a GET from the response cache, building and caching it on a miss.
+    Responses carry a strong ETag; a matching If-None-Match gets a 304.
+    """
+    key = request.full_path
+    version = store.version()
+    entry = response_cache.get(key, version)
+    if entry is None:
+        payload, status = build()
+        if isinstance(payload, handlers.NDJSONStream):
+            return Response(payload.lines, mimetype='application/x-ndjson')
+        if status != 200:
+            return jsonify(payload), status
+        body = jsonify(payload).get_data()
+        entry = body, response_cache.put(key, version, body)
+    
+    body, etag = entry
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+@app.after_request
+def invalidate_cache(response):
+    if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400:
+        response_cache.clear()
+    return response
+
+@app.before_request
+def start_timer():
+    request.environ['user_api.started'] = time.perf_counter()
+
+@app.after_request
+def record_metrics(response):
+    # Read everything off the WSGI environ once; each proxy lookup costs
+    environ = request.environ
+    started = environ.get('user_api.started')
+    if metrics.enabled and started is not None:
+        rule = request.url_rule
+        metrics.observe_request(
+            rule.rule if rule else 'unmatched', environ['REQUEST_METHOD'], response.status_code,
+            time.perf_counter() - started,
+            int(environ.get('CONTENT_LENGTH') or 0),
+            None if response.is_streamed else response.calculate_content_length()
+        )
+    return response
+
+def read_batch():
+    """
+    Read a bulk request body: a JSON array, or NDJSON (one object per line)
+    when sent as application/x-ndjson. Returns None if the body is malformed.
+    """
+    if request.mimetype == 'application/x-ndjson':
+        try:
+            return [json.loads(line) for line in request.stream if line.strip()]
+        except ValueError:
+            return None
+    data = request.get_json(silent=True)
+    return data if isinstance(data, list) else None
+
+def batch_response(results, ok_status):
+    """Report per-item outcomes; the batch is applied only if every item is ok"""
+    applied = all(result['ok'] for result in results)
+    return jsonify({
+        "applied": applied,
+        "total": len(results),
+        "failed": sum(1 for result in results if not result['ok']),
+        "results": results
+    }), ok_status if applied else 400
 
 @app.route('/')
 def home():
-    return jsonify({
-        "message": "User Management API",
-        "endpoints": {
-            "GET /users": "Get all users",
-            "GET /users/<id>": "Get user by ID",
-            "POST /users": "Create new user",
-            "PUT /users/<id>": "Update user by ID",
-            "DELETE /users/<id>": "Delete user by ID"
-        }
-    })
+    payload, status = handlers.home(dict(handlers.ENDPOINTS, **{
+        "POST /users/bulk": "Create many users (JSON array or NDJSON)",
+        "PATCH /users/bulk": "Update many users; each item needs an id",
+        "DELETE /users/bulk": "Delete many users by id"
+    }))
+    return jsonify(payload), status
 
 # GET all users
 @app.route('/users', methods=['GET'])
 def get_users():
-    return jsonify({
-        "users": users,
-        "total": len(users)
-    })
+    return cached_json(lambda: handlers.list_users(store, request.args))
 
 # GET single user by ID
 @app.route('/users/<int:user_id>', methods=['GET'])
 def get_user(user_id):
-    user = users.get(user_id)
-    if user:
-        return jsonify(user)
-    return jsonify({"error": "User not found"}), 404
+    return cached_json(lambda: handlers.get_user(store, user_id))
 
 # CREATE new user
 @app.route('/users', methods=['POST'])
 def create_user():
-    global user_id_counter
-    
-    data = request.get_json()
-    
-    # Validation
-    if not data or not data.get('name') or not data.get('email'):
-        return jsonify({"error": "Name and email are required"}), 400
-    
-    # Check if email already exists
-    if any(user['email'] == data['email'] for user in users.values()):
-        return jsonify({"error": "Email already exists"}), 400
-    
-    # Create new user
-    user = {
-        "id": user_id_counter,
-        "name": data['name'],
-        "email": data['email'],
-        "age": data.get('age'),
-        "city": data.get('city')
-    }
-    
-    users[user_id_counter] = user
-    user_id_counter += 1
-    
-    return jsonify(user), 201
+    payload, status = handlers.create_user(store, request.get_json())
+    return jsonify(payload), status
 
 # UPDATE user by ID
 @app.route('/users/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
-    if user_id not in users:
-        return jsonify({"error": "User not found"}), 404
-    
-    data = request.get_json()
-    user = users[user_id]
-    
-    # Update fields if provided
-    if 'name' in data:
-        user['name'] = data['name']
-    if 'email' in data:
-        # Check if email already exists for other users
-        if any(u['email'] == data['email'] for uid, u in users.items() if uid != user_id):
-            return jsonify({"error": "Email already exists"}), 400
-        user['email'] = data['email']
-    if 'age' in data:
-        user['age'] = data['age']
-    if 'city' in data:
-        user['city'] = data['city']
-    
-    users[user_id] = user
-    return jsonify(user)
+    payload, status = handlers.update_user(store, user_id, request.get_json())
+    return jsonify(payload), status
 
 # DELETE user by ID
 @app.route('/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
-    if user_id not in users:
-        return jsonify({"error": "User not found"}), 404
+    payload, status = handlers.delete_user(store, user_id)
+    return jsonify(payload), status
+
+# Metrics in Prometheus text format
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Bulk endpoints: the whole batch is validated in one pass and applied
+# atomically; if any item fails nothing is written.
+def check_batch(items):
+    if items is None:
+        return jsonify({"error": "Body must be a JSON array or NDJSON"}), 400
+    if len(items) > MAX_BULK_ITEMS:
+        return jsonify({"error": f"At most {MAX_BULK_ITEMS} items per batch"}), 413
+    return None
+
+def is_user_id(value):
+    """True for a JSON integer id (JSON booleans decode to bool, an int subclass)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+# CREATE many users
+@app.route('/users/bulk', methods=['POST'])
+def bulk_create_users():
+    items = read_batch()
+    error = check_batch(items)
+    if error:
+        return error
     
-    deleted_user = users.pop(user_id)
-    return jsonify({
-        "message": "User deleted successfully",
-        "deleted_user": deleted_user
-    })
+    existing = store.find_emails(item['email'] for item in items
+                                 if isinstance(item, dict) and isinstance(item.get('email'), str))
+    seen = set()
+    results = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('name') or not isinstance(item.get('email'), str) or not item['email']:
+            results.append({"index": index, "ok": False, "error": "Name and email are required"})
+        elif handlers.field_error(item):
+            results.append({"index": index, "ok": False, "error": handlers.field_error(item)})
+        elif item['email'] in existing or item['email'] in seen:
+            results.append({"index": index, "ok": False, "error": "Email already exists"})
+        else:
+            results.append({"index": index, "ok": True})
+        if results[-1]['ok']:
+            seen.add(item['email'])
+    
+    if all(result['ok'] for result in results):
+        try:
+            for result, user in zip(results, store.bulk_create(items)):
+                result['user'] = user
+        except EmailExistsError:
+            return jsonify({"error": "Email already exists"}), 409
+    return batch_response(results, 201)
+
+# UPDATE many users
+@app.route('/users/bulk', methods=['PATCH'])
+def bulk_update_users():
+    items = read_batch()
+    error = check_batch(items)
+    if error:
+        return error
+    
+    valid = [item for item in items if isinstance(item, dict) and is_user_id(item.get('id'))]
+    known_ids = store.find_ids(item['id'] for item in valid)
+    owners = store.find_emails(item['email'] for item in valid if isinstance(item.get('email'), str))
+    claimed = {}
+    results = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not is_user_id(item.get('id')):
+            results.append({"index": index, "ok": False, "error": "Each item needs an integer id"})
+        elif item['id'] not in known_ids:
+            results.append({"index": index, "ok": False, "error": "User not found"})
+        elif handlers.field_error(item):
+            results.append({"index": index, "ok": False, "error": handlers.field_error(item)})
+        elif 'email' in item and (owners.get(item['email'], item['id']) != item['id']
+                                  or claimed.get(item['email'], item['id']) != item['id']):
+            results.append({"index": index, "ok": False, "error": "Email already exists"})
+        else:
+            results.append({"index": index, "ok": True})
+        if results[-1]['ok'] and 'email' in item:
+            claimed.setdefault(item['email'], item['id'])
+    
+    if all(result['ok'] for result in results):
+        try:
+            for result, user in zip(results, store.bulk_update(items)):
+                result['user'] = user
+        except EmailExistsError:
+            return jsonify({"error": "Email already exists"}), 409
+        except KeyError:
+            return jsonify({"error": "User not found"}), 409
+    return batch_response(results, 200)
+
+# DELETE many users
+@app.route('/users/bulk', methods=['DELETE'])
+def bulk_delete_users():
+    items = read_batch()
+    error = check_batch(items)
+    if error:
+        return error
+    
+    # Accept bare ids or {"id": ...} objects
+    ids = [item.get('id') if isinstance(item, dict) else item for item in items]
+    known_ids = store.find_ids(user_id for user_id in ids if is_user_id(user_id))
+    seen = set()
+    results = []
+    for index, user_id in enumerate(ids):
+        if not is_user_id(user_id):
+            results.append({"index": index, "ok": False, "error": "Each item needs an integer id"})
+        elif user_id not in known_ids:
+            results.append({"index": index, "ok": False, "error": "User not found"})
+        elif user_id in seen:
+            results.append({"index": index, "ok": False, "error": "Duplicate id in batch"})
+        else:
+            results.append({"index": index, "ok": True})
+            seen.add(user_id)
+    
+    if all(result['ok'] for result in results):
+        try:
+            for result, user in zip(results, store.bulk_delete(ids)):
+                result['deleted_user'] = user
+        except KeyError:
+            return jsonify({"error": "User not found"}), 409
+    return batch_response(results, 200)
 
 # Error handlers
 @app.errorhandler(404)
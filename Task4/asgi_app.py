@@ -0,0 +1,164 @@
+"""
+Asyncio-native (ASGI) variant of the User Management API.
+
+Serves the same routes with the same JSON contracts as the Flask app in
+app.py (both wrap handlers.py), but each in-flight request is a coroutine
+rather than a thread, so one process can hold thousands of idle keep-alive
+connections. No framework is needed; run it under any ASGI server, e.g.
+
+    uvicorn asgi_app:app --port 8000
+
+Store calls are cheap dict operations for the in-memory backend and run
+inline; for the SQLite backend they are pushed to a thread pool so a slow
+query never blocks the event loop.
+"""
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import parse_qsl
+
+import handlers
+from storage import MemoryUserStore, create_store
+
+# User storage backend, selected with USER_STORE=memory|sqlite (and USER_DB)
+store = create_store()
+
+USER_PATH = re.compile(r'^/users/(\d+)$')
+STREAM_CHUNK = 500
+
+# SQLite connections are per thread and an export's cursor lives on one, so
+# every NDJSON export runs on this single long-lived thread
+export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ndjson-export')
+
+
+async def call_store(handler, *args):
+    """Run a handler inline for the memory store, in a worker thread otherwise"""
+    if isinstance(store, MemoryUserStore):
+        return handler(store, *args)
+    return await asyncio.get_running_loop().run_in_executor(None, handler, store, *args)
+
+
+async def read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def read_json(scope, receive):
+    """Decode a JSON body; returns (data, error payload, error status)"""
+    body = await read_body(receive)
+    content_type = dict(scope['headers']).get(b'content-type', b'').split(b';')[0].strip()
+    if content_type != b'application/json':
+        return None, {"error": "Content-Type must be application/json"}, 415
+    try:
+        return json.loads(body), None, None
+    except ValueError:
+        return None, {"error": "Request body is not valid JSON"}, 400
+
+
+async def send_json(send, payload, status):
+    # Same encoding as Flask's jsonify: compact, sorted keys, trailing newline
+    body = (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_ndjson(send, args):
+    """Stream GET /users?format=ndjson in chunks without building the full list"""
+    loop = asyncio.get_running_loop()
+    inline = isinstance(store, MemoryUserStore)
+
+    async def run(fn, *fn_args):
+        if inline:
+            return fn(*fn_args)
+        return await loop.run_in_executor(export_executor, fn, *fn_args)
+
+    payload, status = await run(handlers.list_users, store, args)
+    if not isinstance(payload, handlers.NDJSONStream):
+        await send_json(send, payload, status)
+        return
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'application/x-ndjson')]
+    })
+    while True:
+        chunk = await run(lambda: ''.join(islice(payload.lines, STREAM_CHUNK)))
+        if not chunk:
+            break
+        await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            export_executor.shutdown(wait=True)
+            store.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    try:
+        await route(scope, receive, send)
+    except Exception:
+        await send_json(send, {"error": "Internal server error"}, 500)
+
+
+async def route(scope, receive, send):
+    method, path = scope['method'], scope['path']
+    match = USER_PATH.match(path)
+
+    if path == '/' and method == 'GET':
+        payload, status = handlers.home()
+    elif path == '/users' and method == 'GET':
+        args = dict(parse_qsl(scope['query_string'].decode(), keep_blank_values=True))
+        if args.get('format') == 'ndjson':
+            await send_ndjson(send, args)
+            return
+        payload, status = await call_store(handlers.list_users, args)
+    elif path == '/users' and method == 'POST':
+        data, payload, status = await read_json(scope, receive)
+        if payload is None:
+            payload, status = await call_store(handlers.create_user, data)
+    elif match and method == 'GET':
+        payload, status = await call_store(handlers.get_user, int(match.group(1)))
+    elif match and method == 'PUT':
+        data, payload, status = await read_json(scope, receive)
+        if payload is None:
+            payload, status = await call_store(handlers.update_user, int(match.group(1)), data)
+    elif match and method == 'DELETE':
+        payload, status = await call_store(handlers.delete_user, int(match.group(1)))
+    elif path in ('/', '/users') or match:
+        payload, status = {"error": "Method not allowed"}, 405
+    else:
+        payload, status = {"error": "Endpoint not found"}, 404
+
+    await send_json(send, payload, status)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 8000)))
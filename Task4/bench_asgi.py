@@ -0,0 +1,169 @@
+"""
+Side-by-side throughput/latency benchmark: Flask (threaded WSGI) vs the
+asyncio/ASGI variant of the User Management API.
+
+Each server runs in its own subprocess, seeded with the same users. A local
+asyncio load generator then opens N connections and drives a read-mostly
+workload (GET by id, paginated list, some POSTs) at each one. Both servers
+keep connections alive: Flask runs on Werkzeug's threaded server with the
+HTTP/1.1 handler from loadtest.py (one thread per open connection), the
+ASGI app on uvicorn (one event loop). So what is measured is
+thread-per-connection against asyncio at the same connection counts, not
+connection setup. Should a server answer "Connection: close", the generator
+reconnects, as real clients would.
+
+Usage: python bench_asgi.py [--connections 50 500] [--requests 20000]
+                            [--seed 10000] [--servers flask asgi]
+Requires uvicorn for the ASGI server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(kind, port, seed):
+    """Subprocess entry point: seed an in-memory store and serve it"""
+    os.environ['USER_STORE'] = 'memory'
+    if kind == 'flask':
+        import logging
+        from werkzeug.serving import make_server
+        import app as api
+        from loadtest import KeepAliveHandler, seed as seed_store
+        seed_store(api.store, seed)
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server('127.0.0.1', port, api.app, threaded=True, request_handler=KeepAliveHandler)
+        print(port, flush=True)
+        server.serve_forever()
+    else:
+        import uvicorn
+        import asgi_app
+        from loadtest import seed as seed_store
+        seed_store(asgi_app.store, seed)
+        print(port, flush=True)
+        uvicorn.run(asgi_app.app, host='127.0.0.1', port=port, log_level='warning',
+                    backlog=4096)
+
+
+def start(kind, seed):
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, __file__, '--serve', kind, '--port', str(port), '--seed', str(seed)],
+                            cwd=HERE, stdout=subprocess.PIPE, text=True)
+    port = int(proc.stdout.readline())
+    # Wait until the server accepts connections
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+async def read_response(reader):
+    """Read one response; returns (status, whether the server closes the connection)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    closing = False
+    for line in head.split(b'\r\n'):
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'connection' and value.strip().lower() == b'close':
+            closing = True
+    await reader.readexactly(length)
+    return status, closing
+
+
+async def connection(port, conn_id, count, seeded, latencies, errors):
+    rng = random.Random(conn_id)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for i in range(count):
+            roll = rng.random()
+            if roll < 0.1:
+                body = json.dumps({"name": "Bench", "email": f"bench-{conn_id}-{i}@example.com"}).encode()
+                request = (b'POST /users HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n'
+                           b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body)
+            elif roll < 0.7:
+                request = f'GET /users/{rng.randint(1, seeded)} HTTP/1.1\r\nHost: bench\r\n\r\n'.encode()
+            else:
+                request = f'GET /users?limit=20&cursor={rng.randint(0, seeded)} HTTP/1.1\r\nHost: bench\r\n\r\n'.encode()
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, closing = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status >= 500:
+                errors.append(status)
+            if closing:
+                # The server ended the keep-alive connection
+                writer.close()
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    finally:
+        writer.close()
+
+
+async def drive(port, connections, total, seeded):
+    latencies, errors = [], []
+    per_connection = max(1, total // connections)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(connection(port, i, per_connection, seeded, latencies, errors)
+                                     for i in range(connections)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    return latencies, len(errors) + failed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask vs ASGI user API benchmark")
+    parser.add_argument('--connections', type=int, nargs='+', default=[50, 500])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=10000)
+    parser.add_argument('--servers', nargs='+', default=['flask', 'asgi'])
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.seed)
+        return
+
+    print(f"{'Server':<7} {'Conns':>6} {'Requests':>9} {'Errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind in args.servers:
+        for connections in args.connections:
+            proc, port = start(kind, args.seed)
+            try:
+                latencies, errors, elapsed = asyncio.run(drive(port, connections, args.requests, args.seed))
+            finally:
+                proc.terminate()
+                proc.wait()
+            latencies.sort()
+            if not latencies:
+                print(f"{kind:<7} {connections:>6} no successful requests ({errors} errors)")
+                continue
+            print(f"{kind:<7} {connections:>6} {len(latencies):>9} {errors:>7} {len(latencies) / elapsed:>9.0f} "
+                  f"{statistics.median(latencies) * 1000:>8.2f} "
+                  f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>8.2f} "
+                  f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
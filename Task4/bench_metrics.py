@@ -0,0 +1,86 @@
+"""
+Overhead benchmark for the request metrics hooks.
+
+Runs the same request mix through Flask's test client with metrics switched
+on and off, alternating rounds to even out noise. Because run-to-run noise is
+larger than the hooks themselves, it also times the before/after request
+hooks in isolation and reports them as a share of the median request time.
+
+Usage: python bench_metrics.py [--rounds 5] [--requests 3000]
+"""
+import argparse
+import statistics
+import time
+
+import app as api
+from loadtest import seed
+from storage import MemoryUserStore
+
+
+def set_metrics(enabled):
+    api.metrics.enabled = enabled
+    api.store.observe = api.metrics.observe_timing if enabled else None
+
+
+def run_round(client, request_count, offset):
+    start = time.perf_counter()
+    for i in range(request_count):
+        kind = i % 4
+        if kind == 0:
+            client.post('/users', json={"name": "Bench", "email": f"bench{offset + i}@example.com"})
+        elif kind == 1:
+            client.get(f'/users/{i % 1000 + 1}')
+        elif kind == 2:
+            client.put(f'/users/{i % 1000 + 1}', json={"age": i % 80})
+        else:
+            client.get(f'/users?limit=20&cursor={i % 1000}')
+    return time.perf_counter() - start
+
+
+def hook_cost(iterations=50000):
+    """Average seconds spent in the metrics hooks for one request"""
+    with api.app.test_request_context('/users/1', method='GET'):
+        response = api.app.response_class('{"id":1}', mimetype='application/json')
+        start = time.perf_counter()
+        for _ in range(iterations):
+            api.start_timer()
+            api.record_metrics(response)
+        return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure request metrics overhead")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    api.store = MemoryUserStore()
+    api.response_cache.max_entries = 0      # measure handlers, not cache hits
+    seed(api.store, 1000)
+    client = api.app.test_client()
+
+    # Warm up imports, caches and the allocator before timing anything
+    run_round(client, args.requests, 0)
+    offset = args.requests
+
+    timings = {True: [], False: []}
+    for round_number in range(args.rounds):
+        order = (False, True) if round_number % 2 == 0 else (True, False)
+        for enabled in order:
+            set_metrics(enabled)
+            timings[enabled].append(run_round(client, args.requests, offset))
+            offset += args.requests
+
+    off = statistics.median(timings[False])
+    on = statistics.median(timings[True])
+    print(f"metrics off: {args.requests / off:>8.0f} req/s ({off / args.requests * 1e6:.1f} us/request)")
+    print(f"metrics on:  {args.requests / on:>8.0f} req/s ({on / args.requests * 1e6:.1f} us/request)")
+    print(f"end-to-end:  {(on - off) / off * 100:+.2f}% (includes run-to-run noise)")
+    set_metrics(True)
+    cost = hook_cost()
+    per_request = off / args.requests
+    print(f"hook cost:   {cost * 1e6:.2f} us/request = {cost / per_request * 100:.2f}% of a request")
+
+
+if __name__ == '__main__':
+    main()
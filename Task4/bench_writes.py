@@ -0,0 +1,66 @@
+"""
+Write-latency benchmark for the User Management API.
+
+Pre-loads the store with N users, then times POST /users and PUT /users/<id>
+through Flask's test client. With the email index in place the per-request
+latency should stay flat as N grows.
+
+Usage: python bench_writes.py [sizes...]
+"""
+import statistics
+import sys
+import time
+
+import app as api
+from storage import MemoryUserStore
+
+
+def preload(count):
+    """Start from an empty in-memory store and fill it directly, bypassing HTTP"""
+    api.store = MemoryUserStore()
+    for i in range(count):
+        api.store.create({
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "age": 18 + i % 60,
+            "city": f"City {i % 100}"
+        })
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(size, requests_per_size=500):
+    preload(size)
+    client = api.app.test_client()
+
+    post_times = []
+    for i in range(requests_per_size):
+        payload = {"name": "Bench", "email": f"bench{i}@example.com", "age": 30, "city": "Pune"}
+        start = time.perf_counter()
+        client.post('/users', json=payload)
+        post_times.append(time.perf_counter() - start)
+
+    put_times = []
+    for i in range(requests_per_size):
+        start = time.perf_counter()
+        client.put(f'/users/{i % size + 1}', json={"email": f"changed{i}@example.com"})
+        put_times.append(time.perf_counter() - start)
+
+    return post_times, put_times
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000, 500_000]
+    print(f"{'Users':>10} {'POST p50':>10} {'POST p99':>10} {'PUT p50':>10} {'PUT p99':>10}  (ms)")
+    for size in sizes:
+        post_times, put_times = run(size)
+        print(f"{size:>10} "
+              f"{statistics.median(post_times) * 1000:>10.3f} {percentile(post_times, 99) * 1000:>10.3f} "
+              f"{statistics.median(put_times) * 1000:>10.3f} {percentile(put_times, 99) * 1000:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
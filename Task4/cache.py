@@ -0,0 +1,61 @@
+"""
+Bounded LRU cache of serialized JSON responses for the User Management API.
+
+Entries are keyed by request path + query string and tagged with the store
+version they were built from, so a write made by any process (the SQLite
+store keeps its version in the database) turns older entries into misses.
+The app also clears the cache outright after every successful write.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()    # key -> (version, body, etag)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_etag(body):
+        return hashlib.sha1(body).hexdigest()
+
+    def get(self, key, version):
+        """Return (body, etag) if cached for this store version, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, version, body):
+        """Cache a response body and return its strong ETag"""
+        etag = self.make_etag(body)
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return etag
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[key] = (version, body, etag)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,163 @@
+"""
+Framework-neutral request handlers for the User Management API.
+
+Each function takes the store plus already-decoded request data and returns
+(payload, status). The Flask app (app.py) and the asyncio/ASGI app
+(asgi_app.py) both wrap these, so the two share one JSON contract.
+"""
+import json
+
+from storage import USER_FIELDS, EmailExistsError
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+ENDPOINTS = {
+    "GET /users": "Get all users (supports limit, cursor, fields, city, age_min, age_max, format=ndjson)",
+    "GET /users/<id>": "Get user by ID",
+    "POST /users": "Create new user",
+    "PUT /users/<id>": "Update user by ID",
+    "DELETE /users/<id>": "Delete user by ID"
+}
+
+
+class NDJSONStream:
+    """Returned by list_users in place of a payload when format=ndjson"""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+
+def field_error(data):
+    """
+    Return an error message if any user field in `data` has the wrong type
+    (name, email and city must be strings, age a number; city and age may
+    be null), else None.
+    """
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object"
+    for field in ('name', 'email'):
+        if field in data and not isinstance(data[field], str):
+            return f"{field} must be a string"
+    if data.get('city') is not None and not isinstance(data['city'], str):
+        return "city must be a string"
+    age = data.get('age')
+    if age is not None and (isinstance(age, bool) or not isinstance(age, (int, float))):
+        return "age must be a number"
+    return None
+
+
+def project(user, fields):
+    """Return only the requested fields of a user"""
+    if not fields:
+        return user
+    return {field: user.get(field) for field in fields}
+
+
+def home(endpoints=ENDPOINTS):
+    return {
+        "message": "User Management API",
+        "endpoints": endpoints
+    }, 200
+
+
+def list_users(store, args):
+    """GET /users; `args` is a mapping of query parameters"""
+    if not args:
+        # Legacy response: the whole store keyed by id
+        return {
+            "users": store.all(),
+            "total": store.count()
+        }, 200
+
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+        cursor = int(args.get('cursor', 0))
+        age_min = int(args['age_min']) if 'age_min' in args else None
+        age_max = int(args['age_max']) if 'age_max' in args else None
+    except ValueError:
+        return {"error": "limit, cursor, age_min and age_max must be integers"}, 400
+    if limit < 1:
+        return {"error": "limit must be positive"}, 400
+
+    fields = [field for field in args.get('fields', '').split(',') if field]
+    unknown = [field for field in fields if field not in USER_FIELDS]
+    if unknown:
+        return {"error": f"Unknown fields: {', '.join(unknown)}"}, 400
+
+    filters = dict(city=args.get('city'), age_min=age_min, age_max=age_max, after_id=cursor)
+
+    # Stream NDJSON for exports; the full list is never built in memory
+    if args.get('format') == 'ndjson':
+        total, matches = store.query(limit=limit if 'limit' in args else None, **filters)
+        lines = (json.dumps(project(user, fields)) + '\n' for user in matches)
+        return NDJSONStream(lines), 200
+
+    # Fetch one extra row to learn whether another page follows
+    limit = min(limit, MAX_PAGE_SIZE)
+    total, matches = store.query(limit=limit + 1, **filters)
+    page = []
+    last_id = None
+    has_more = False
+    for user in matches:
+        if len(page) == limit:
+            has_more = True
+            break
+        page.append(project(user, fields))
+        last_id = user['id']
+
+    return {
+        "users": page,
+        "total": total,
+        "next_cursor": last_id if has_more else None
+    }, 200
+
+
+def get_user(store, user_id):
+    user = store.get(user_id)
+    if user:
+        return user, 200
+    return {"error": "User not found"}, 404
+
+
+def create_user(store, data):
+    # Validation
+    if not isinstance(data, dict) or not data.get('name') or not data.get('email'):
+        return {"error": "Name and email are required"}, 400
+    error = field_error(data)
+    if error:
+        return {"error": error}, 400
+
+    # Create new user; the store enforces email uniqueness
+    try:
+        user = store.create(data)
+    except EmailExistsError:
+        return {"error": "Email already exists"}, 400
+    return user, 201
+
+
+def update_user(store, user_id, data):
+    error = field_error(data or {})
+    if error:
+        return {"error": error}, 400
+
+    # Update fields if provided
+    try:
+        user = store.update(user_id, data or {})
+    except EmailExistsError:
+        return {"error": "Email already exists"}, 400
+
+    if user is None:
+        return {"error": "User not found"}, 404
+    return user, 200
+
+
+def delete_user(store, user_id):
+    deleted_user = store.delete(user_id)
+    if deleted_user is None:
+        return {"error": "User not found"}, 404
+
+    return {
+        "message": "User deleted successfully",
+        "deleted_user": deleted_user
+    }, 200
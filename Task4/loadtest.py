@@ -0,0 +1,131 @@
+"""
+Load-test harness comparing the user storage backends.
+
+For each backend it starts the Flask app on a threaded local server, seeds it
+with users, then drives a mixed read/write workload from several client
+threads over keep-alive connections and reports throughput and latency.
+
+Usage: python loadtest.py [--backends memory sqlite] [--clients 16]
+                          [--requests 2000] [--seed 5000] [--write-ratio 0.2]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+import app as api
+from storage import create_store
+
+
+class KeepAliveHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+
+def start_server(store):
+    """Serve the app with the given store on a free local port"""
+    api.store = store
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, api.app, threaded=True, request_handler=KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def seed(store, count):
+    for i in range(count):
+        store.create({"name": f"Seed {i}", "email": f"seed{i}@example.com",
+                      "age": 18 + i % 60, "city": f"City {i % 50}"})
+
+
+def client_worker(port, worker_id, request_count, write_ratio, seeded):
+    """Issue request_count requests on one connection, returning latencies"""
+    rng = random.Random(worker_id)
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Content-Type': 'application/json'}
+    latencies = []
+    errors = 0
+    for i in range(request_count):
+        roll = rng.random()
+        if roll < write_ratio / 2:
+            body = json.dumps({"name": "Load", "email": f"load-{worker_id}-{i}@example.com",
+                               "age": rng.randint(18, 80), "city": f"City {rng.randint(0, 49)}"})
+            method, path = 'POST', '/users'
+        elif roll < write_ratio:
+            body = json.dumps({"age": rng.randint(18, 80)})
+            method, path = 'PUT', f'/users/{rng.randint(1, seeded)}'
+        elif roll < 0.5 + write_ratio / 2:
+            body = None
+            method, path = 'GET', f'/users/{rng.randint(1, seeded)}'
+        else:
+            body = None
+            method, path = 'GET', f'/users?limit=50&city=City%20{rng.randint(0, 49)}'
+
+        start = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status >= 500:
+            errors += 1
+    conn.close()
+    return latencies, errors
+
+
+def run_backend(backend, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = create_store(backend, os.path.join(tmp, 'loadtest.db'))
+        seed(store, args.seed)
+        server = start_server(store)
+        port = server.server_port
+        per_client = args.requests // args.clients
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            results = list(pool.map(
+                lambda worker_id: client_worker(port, worker_id, per_client, args.write_ratio, args.seed),
+                range(args.clients)))
+        elapsed = time.perf_counter() - start
+
+        server.shutdown()
+        store.close()
+
+    latencies = sorted(latency for worker_latencies, _ in results for latency in worker_latencies)
+    errors = sum(worker_errors for _, worker_errors in results)
+    return {
+        "backend": backend,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare user storage backends under load")
+    parser.add_argument('--backends', nargs='+', default=['memory', 'sqlite'])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=5000)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{'Backend':<10} {'Requests':>9} {'Errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for backend in args.backends:
+        r = run_backend(backend, args)
+        print(f"{r['backend']:<10} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.0f} "
+              f"{r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Lightweight request metrics for the User Management API, exported in the
+Prometheus text format.
+
+Per route and method it tracks request counts by status code, a latency
+histogram plus p50/p95/p99 over a sliding window of recent requests, and
+request/response payload sizes. Stores can also report named timings (the
+email uniqueness checks: the email claim in memory, the INSERT/UPDATE that
+enforces the UNIQUE constraint on SQLite) through Metrics.observe_timing.
+
+Recording a request costs two bisects, a few dict updates and one
+short-held lock, so it is cheap enough to leave on in production.
+"""
+import bisect
+import threading
+from collections import deque
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+TIMING_BUCKETS = (0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUANTILES = (0.5, 0.95, 0.99)
+WINDOW = 2048
+
+
+class Histogram:
+    """Cumulative-bucket histogram; callers hold the Metrics lock"""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class Metrics:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.requests = {}       # (route, method, status) -> count
+        self.latency = {}        # (route, method) -> Histogram
+        self.recent = {}         # (route, method) -> deque of recent latencies
+        self.request_size = {}   # (route, method) -> Histogram
+        self.response_size = {}  # (route, method) -> Histogram
+        self.timings = {}        # name -> Histogram
+
+    def observe_request(self, route, method, status, seconds, request_bytes, response_bytes):
+        key = (route, method)
+        with self._lock:
+            status_key = (route, method, status)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.recent[key] = deque(maxlen=WINDOW)
+                self.request_size[key] = Histogram(SIZE_BUCKETS)
+                self.response_size[key] = Histogram(SIZE_BUCKETS)
+            histogram.observe(seconds)
+            self.recent[key].append(seconds)
+            self.request_size[key].observe(request_bytes)
+            if response_bytes is not None:
+                self.response_size[key].observe(response_bytes)
+
+    def observe_timing(self, name, seconds):
+        with self._lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = Histogram(TIMING_BUCKETS)
+            histogram.observe(seconds)
+
+    def quantiles(self, route, method):
+        """Return {quantile: seconds} over the recent window for one route"""
+        with self._lock:
+            samples = sorted(self.recent.get((route, method), ()))
+        if not samples:
+            return {}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in QUANTILES}
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            requests = dict(self.requests)
+            keys = list(self.latency)
+        lines = [
+            '# HELP user_api_requests_total Requests handled, by route, method and status.',
+            '# TYPE user_api_requests_total counter',
+        ]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f'user_api_requests_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+
+        sections = (
+            ('user_api_request_duration_seconds', 'Request latency.', self.latency),
+            ('user_api_request_size_bytes', 'Request body size.', self.request_size),
+            ('user_api_response_size_bytes', 'Response body size.', self.response_size),
+        )
+        for name, help_text, histograms in sections:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            with self._lock:
+                for route, method in sorted(keys):
+                    lines.extend(histograms[(route, method)].render(name, f'route="{route}",method="{method}"'))
+
+        lines.append(f'# HELP user_api_request_latency_seconds Latency quantiles over the last {WINDOW} requests.')
+        lines.append('# TYPE user_api_request_latency_seconds summary')
+        for route, method in sorted(keys):
+            for q, value in self.quantiles(route, method).items():
+                lines.append(f'user_api_request_latency_seconds{{route="{route}",method="{method}",quantile="{q}"}} {value}')
+
+        lines.append('# HELP user_api_store_operation_seconds Time spent in instrumented store operations.')
+        lines.append('# TYPE user_api_store_operation_seconds histogram')
+        with self._lock:
+            for name in sorted(self.timings):
+                lines.extend(self.timings[name].render('user_api_store_operation_seconds', f'operation="{name}"'))
+        return '\n'.join(lines) + '\n'
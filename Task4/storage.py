@@ -0,0 +1,686 @@
+"""
+Storage backends for the User Management API.
+
+Route handlers in app.py talk to a UserStore; which one is used is picked at
+startup (see create_store). MemoryUserStore keeps everything in process
+dictionaries, SQLiteUserStore persists to a database file so that data
+survives restarts and several worker processes can share it.
+"""
+import bisect
+import functools
+import heapq
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from itertools import count, groupby, islice
+
+USER_FIELDS = ('id', 'name', 'email', 'age', 'city')
+
+
+class EmailExistsError(Exception):
+    """Raised when a write would give two users the same email"""
+
+
+def timed(name):
+    """Report a method's run time to the store's `observe` hook, if one is set"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.observe is None:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class UserStore:
+    """
+    Interface every backend implements. Users are plain dicts with the keys
+    in USER_FIELDS.
+    """
+
+    # Optional callback(operation name, seconds) used for instrumentation
+    observe = None
+
+    def get(self, user_id):
+        """Return the user with this id, or None"""
+        raise NotImplementedError
+
+    def all(self):
+        """Return every user as a dict keyed by id"""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def create(self, data):
+        """Create a user from name/email/age/city and return it"""
+        raise NotImplementedError
+
+    def update(self, user_id, changes):
+        """Apply changes to a user and return it, or None if it does not exist"""
+        raise NotImplementedError
+
+    def delete(self, user_id):
+        """Delete a user and return it, or None if it does not exist"""
+        raise NotImplementedError
+
+    def query(self, city=None, age_min=None, age_max=None, after_id=0, limit=None):
+        """
+        Return (total matches, iterator of matching users with id > after_id
+        in ascending id order, at most `limit` of them).
+        """
+        raise NotImplementedError
+
+    def version(self):
+        """Token that changes whenever any user is written"""
+        raise NotImplementedError
+
+    def find_emails(self, emails):
+        """Return {email: user id} for those of `emails` already in use"""
+        raise NotImplementedError
+
+    def find_ids(self, user_ids):
+        """Return the subset of `user_ids` that exist"""
+        raise NotImplementedError
+
+    def bulk_create(self, items):
+        """Create all users in one atomic step and return them in order"""
+        raise NotImplementedError
+
+    def bulk_update(self, items):
+        """Apply a list of change dicts (each carrying 'id') atomically"""
+        raise NotImplementedError
+
+    def bulk_delete(self, user_ids):
+        """Delete all given users atomically and return them in order"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryUserStore(UserStore):
+    """
+    Process-local store: a dict of users plus secondary indexes.
+
+    Safe under threaded servers without a global lock around reads:
+      * ids come from an itertools.count, whose next() is atomic, and are
+        drawn only once the new user's email is claimed, so a rejected
+        create uses up no id (as with SQLite's AUTOINCREMENT);
+      * emails are claimed with dict.setdefault on the email index, which is
+        atomic, so two writers can never both win the same address;
+      * writers to the same user serialise on one of a fixed set of striped
+        locks, and updates swap in a new user dict rather than mutating the
+        old one, so readers always see a complete record;
+      * the compound index structures (sorted id lists) are changed under a
+        short writer-only lock; readers copy short slices before iterating.
+    """
+
+    STRIPES = 64
+    SCAN_CHUNK = 256     # most ids copied at a time when walking an id list
+
+    def __init__(self):
+        self.users = {}
+        self._ids = count(1)
+        self._stripes = [threading.Lock() for _ in range(self.STRIPES)]
+        self._index_lock = threading.Lock()
+        self._version = 0
+        self.user_ids = []       # user ids in ascending order, for cursor pagination
+        self.email_index = {}    # email -> user id
+        self.city_index = {}     # city -> ascending list of user ids
+        self.age_index = {}      # age -> ascending list of user ids
+        self.city_age_index = {}  # (city, age) -> ascending list of user ids
+        self.sorted_ages = []    # distinct indexed ages, ascending (for range lookups)
+
+    def _stripe(self, user_id):
+        return self._stripes[user_id % self.STRIPES]
+
+    @timed('uniqueness_check')
+    def _claim_email(self, email, user_id):
+        """
+        Atomically reserve an email for user_id (or a placeholder object, for
+        a user with no id yet); False if someone else owns it
+        """
+        return self.email_index.setdefault(email, user_id) == user_id
+
+    def _release_email(self, email, user_id):
+        if self.email_index.get(email) == user_id:
+            self.email_index.pop(email, None)
+
+    def _index_keys(self, user):
+        """(index, key) pairs a user is listed under"""
+        city, age = user.get('city'), user.get('age')
+        keys = []
+        if city is not None:
+            keys.append((self.city_index, city))
+        if isinstance(age, (int, float)):
+            keys.append((self.age_index, age))
+            if city is not None:
+                keys.append((self.city_age_index, (city, age)))
+        return keys
+
+    def _index(self, user):
+        """Add a user to the city/age indexes (caller holds _index_lock)"""
+        age = user.get('age')
+        if isinstance(age, (int, float)) and age not in self.age_index:
+            bisect.insort(self.sorted_ages, age)
+        for index, key in self._index_keys(user):
+            bisect.insort(index.setdefault(key, []), user['id'])
+
+    def _unindex(self, user):
+        """Remove a user from the city/age indexes (caller holds _index_lock)"""
+        for index, key in self._index_keys(user):
+            ids = index.get(key)
+            if ids is None:
+                continue
+            position = bisect.bisect_left(ids, user['id'])
+            if position < len(ids) and ids[position] == user['id']:
+                del ids[position]
+            if not ids:
+                del index[key]
+        age = user.get('age')
+        if isinstance(age, (int, float)) and age not in self.age_index:
+            position = bisect.bisect_left(self.sorted_ages, age)
+            if position < len(self.sorted_ages) and self.sorted_ages[position] == age:
+                del self.sorted_ages[position]
+
+    def _ages_in_range(self, age_min=None, age_max=None):
+        ages = list(self.sorted_ages)
+        lo = 0 if age_min is None else bisect.bisect_left(ages, age_min)
+        hi = len(ages) if age_max is None else bisect.bisect_right(ages, age_max)
+        return ages[lo:hi]
+
+    def get(self, user_id):
+        return self.users.get(user_id)
+
+    def all(self):
+        return dict(self.users)
+
+    def count(self):
+        return len(self.users)
+
+    def version(self):
+        return self._version
+
+    @timed('uniqueness_check')
+    def find_emails(self, emails):
+        found = {}
+        for email in emails:
+            owner = self.email_index.get(email)
+            if owner is not None:
+                found[email] = owner
+        return found
+
+    def find_ids(self, user_ids):
+        return {user_id for user_id in user_ids if user_id in self.users}
+
+    @staticmethod
+    def _new_user(data):
+        """
+        Build a user dict, without an id yet. Raises TypeError for an email,
+        city or age the indexes cannot hold, before anything has been claimed
+        or published.
+        """
+        user = {
+            "id": None,
+            "name": data['name'],
+            "email": data['email'],
+            "age": data.get('age'),
+            "city": data.get('city')
+        }
+        hash((user['email'], user['city'], user['age']))
+        return user
+
+    def _assign_id(self, user):
+        """Draw an id for a user whose email a placeholder holds, and hand the email to it"""
+        user['id'] = next(self._ids)
+        self.email_index[user['email']] = user['id']
+
+    def _insert(self, user):
+        """Index a new user, then publish it (its email is already claimed)"""
+        with self._index_lock:
+            self._index(user)
+            bisect.insort(self.user_ids, user['id'])
+            self.users[user['id']] = user
+            self._version += 1
+        return user
+
+    @staticmethod
+    def _updated(user, changes):
+        """Build an updated copy of user; TypeError (as in _new_user) before any state changes"""
+        updated = dict(user)
+        for field in ('name', 'email', 'age', 'city'):
+            if field in changes:
+                updated[field] = changes[field]
+        hash((updated['email'], updated['city'], updated['age']))
+        return updated
+
+    def _replace(self, user, updated):
+        """Swap in the updated copy of user (caller holds its stripe lock)"""
+        with self._index_lock:
+            self._unindex(user)
+            self._index(updated)
+            self.users[user['id']] = updated
+            self._version += 1
+        if updated['email'] != user['email']:
+            self._release_email(user['email'], user['id'])
+        return updated
+
+    def _remove(self, user):
+        """Drop a user from the store (caller holds its stripe lock)"""
+        with self._index_lock:
+            del self.users[user['id']]
+            del self.user_ids[bisect.bisect_left(self.user_ids, user['id'])]
+            self._unindex(user)
+            self._version += 1
+        self._release_email(user['email'], user['id'])
+
+    def create(self, data):
+        user = self._new_user(data)
+        if not self._claim_email(user['email'], object()):
+            raise EmailExistsError(user['email'])
+        self._assign_id(user)
+        return self._insert(user)
+
+    def update(self, user_id, changes):
+        with self._stripe(user_id):
+            user = self.users.get(user_id)
+            if user is None:
+                return None
+            updated = self._updated(user, changes)
+            if 'email' in changes and not self._claim_email(changes['email'], user_id):
+                raise EmailExistsError(changes['email'])
+            return self._replace(user, updated)
+
+    def delete(self, user_id):
+        with self._stripe(user_id):
+            user = self.users.get(user_id)
+            if user is not None:
+                self._remove(user)
+            return user
+
+    def _lock_stripes(self, user_ids):
+        """Acquire the stripes covering user_ids in a fixed order (no deadlocks)"""
+        stripes = sorted({user_id % self.STRIPES for user_id in user_ids})
+        for stripe in stripes:
+            self._stripes[stripe].acquire()
+        return stripes
+
+    def _unlock_stripes(self, stripes):
+        for stripe in reversed(stripes):
+            self._stripes[stripe].release()
+
+    def bulk_create(self, items):
+        # Build every user and reserve every email before drawing any id, so
+        # a failure leaves the store (and the id sequence) untouched
+        users = [self._new_user(data) for data in items]
+        claimed = []
+        for user in users:
+            claim = object()
+            if not self._claim_email(user['email'], claim):
+                for email, owner in claimed:
+                    self._release_email(email, owner)
+                raise EmailExistsError(user['email'])
+            claimed.append((user['email'], claim))
+        for user in users:
+            self._assign_id(user)
+        return [self._insert(user) for user in users]
+
+    def bulk_update(self, items):
+        stripes = self._lock_stripes(changes['id'] for changes in items)
+        try:
+            for changes in items:
+                if changes['id'] not in self.users:
+                    raise KeyError(changes['id'])
+            # Build every updated copy (chained when an id repeats) before changing anything
+            latest = {}
+            updates = []
+            for changes in items:
+                user = latest.get(changes['id']) or self.users[changes['id']]
+                latest[changes['id']] = self._updated(user, changes)
+                updates.append((user, latest[changes['id']]))
+            claimed = []
+            for changes in items:
+                if 'email' not in changes:
+                    continue
+                email, user_id = changes['email'], changes['id']
+                if self.email_index.get(email) == user_id:
+                    continue
+                if not self._claim_email(email, user_id):
+                    for claimed_email, owner in claimed:
+                        self._release_email(claimed_email, owner)
+                    raise EmailExistsError(email)
+                claimed.append((email, user_id))
+            return [self._replace(user, updated) for user, updated in updates]
+        finally:
+            self._unlock_stripes(stripes)
+
+    def bulk_delete(self, user_ids):
+        stripes = self._lock_stripes(user_ids)
+        try:
+            missing = set(user_ids) - self.find_ids(user_ids)
+            if missing:
+                raise KeyError(min(missing))
+            users = [self.users[user_id] for user_id in user_ids]
+            for user in users:
+                self._remove(user)
+            return users
+        finally:
+            self._unlock_stripes(stripes)
+
+    def _ids_after(self, after_id, index=None, key=None):
+        """
+        Yield the ids > after_id in ascending order from user_ids, or from the
+        id list index[key]. Walks copies of short slices (growing up to
+        SCAN_CHUNK), finding each next slice by bisecting on the last id
+        yielded, so concurrent inserts and deletes never make it skip or
+        repeat a user.
+        """
+        size = 16
+        while True:
+            ids = self.user_ids if index is None else index.get(key, ())
+            position = bisect.bisect_right(ids, after_id)
+            chunk = ids[position:position + size]
+            if not chunk:
+                return
+            yield from chunk
+            after_id = chunk[-1]
+            size = min(size * 2, self.SCAN_CHUNK)
+
+    def query(self, city=None, age_min=None, age_max=None, after_id=0, limit=None):
+        if city is None and age_min is None and age_max is None:
+            total = len(self.users)
+            ids = self._ids_after(after_id)
+        else:
+            # Merge the sorted id lists that make up the result, lazily from
+            # the cursor on, so a page costs about its own size
+            if age_min is None and age_max is None:
+                index, keys = self.city_index, [city]
+            elif city is None:
+                index, keys = self.age_index, self._ages_in_range(age_min, age_max)
+            else:
+                index, keys = self.city_age_index, [(city, age) for age in self._ages_in_range(age_min, age_max)]
+            total = sum(len(index.get(key, ())) for key in keys)
+            merged = heapq.merge(*(self._ids_after(after_id, index, key) for key in keys))
+            # A user moved between lists mid-walk could come up twice
+            ids = (user_id for user_id, _ in groupby(merged))
+
+        matches = (user for user in map(self.users.get, ids) if user is not None)
+        return total, islice(matches, limit)
+
+class _ThreadConnection:
+    """Keeps a thread's SQLite connection in its thread-local storage"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+
+class SQLiteUserStore(UserStore):
+    """
+    SQLite-backed store. Runs in WAL mode so readers never block the writer,
+    keeps one connection per thread (sqlite3 connections must not be shared
+    across threads), closed when its thread ends, and relies on the
+    per-connection statement cache, so the fixed SQL strings below are
+    prepared once per connection and reused.
+
+    Write transactions take the write lock up front, by bumping
+    store_version first or, where the target row may be missing, with BEGIN
+    IMMEDIATE (no read-then-upgrade deadlocks between processes).
+    store_version changes only when a row does, giving response caches a
+    change token shared by all workers.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS users ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " name TEXT NOT NULL,"
+        " email TEXT NOT NULL UNIQUE,"
+        " age INTEGER,"
+        " city TEXT)",
+        "CREATE INDEX IF NOT EXISTS idx_users_city ON users (city, id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_age ON users (age)",
+        "CREATE TABLE IF NOT EXISTS store_version ("
+        " id INTEGER PRIMARY KEY CHECK (id = 1),"
+        " version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO store_version (id, version) VALUES (1, 0)",
+    )
+    SELECT = "SELECT id, name, email, age, city FROM users"
+    INSERT = "INSERT INTO users (name, email, age, city) VALUES (?, ?, ?, ?)"
+    UPDATE = "UPDATE users SET name = ?, email = ?, age = ?, city = ? WHERE id = ?"
+    BUMP_VERSION = "UPDATE store_version SET version = version + 1 WHERE id = 1"
+    FETCH_SIZE = 500
+    MAX_PARAMS = 500     # bound on host parameters per IN (...) lookup
+
+    def __init__(self, path='users.db'):
+        self.path = path
+        self._local = threading.local()
+        self._connections = set()
+        self._pool_lock = threading.Lock()
+        with self._connection() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self):
+        """Return this thread's connection, opening it on first use"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                   cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # The holder dies with the thread's locals, which closes the connection
+            holder = self._local.holder = _ThreadConnection(conn)
+            weakref.finalize(holder, self._release, conn)
+            with self._pool_lock:
+                self._connections.add(conn)
+        return holder.conn
+
+    def _release(self, conn):
+        """Close a connection whose thread has ended (unless close() already did)"""
+        with self._pool_lock:
+            if conn not in self._connections:
+                return
+            self._connections.discard(conn)
+        conn.close()
+
+    def _users(self, cursor):
+        """Stream rows from a cursor in batches, as user dicts"""
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(USER_FIELDS, row))
+
+    def _fetch(self, conn, user_id):
+        row = conn.execute(self.SELECT + " WHERE id = ?", (user_id,)).fetchone()
+        return dict(zip(USER_FIELDS, row)) if row else None
+
+    def get(self, user_id):
+        return self._fetch(self._connection(), user_id)
+
+    def all(self):
+        return {user['id']: user for user in self._users(self._connection().execute(self.SELECT + " ORDER BY id"))}
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def version(self):
+        # Kept in the database so writes from other worker processes count too
+        return self._connection().execute("SELECT version FROM store_version WHERE id = 1").fetchone()[0]
+
+    def create(self, data):
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute(self.BUMP_VERSION)
+                cursor = self._write_user(conn, self.INSERT, (data['name'], data['email'], data.get('age'),
+                                                              data.get('city')))
+        except sqlite3.IntegrityError:
+            raise EmailExistsError(data['email'])
+        return {
+            "id": cursor.lastrowid,
+            "name": data['name'],
+            "email": data['email'],
+            "age": data.get('age'),
+            "city": data.get('city')
+        }
+
+    @timed('uniqueness_check')
+    def _write_user(self, conn, sql, params):
+        """
+        Run an INSERT or an email-changing UPDATE. SQLite checks the UNIQUE
+        email constraint inside that statement, so this is what is timed as
+        the uniqueness check on this backend.
+        """
+        return conn.execute(sql, params)
+
+    def _apply_update(self, conn, user_id, changes):
+        user = self._fetch(conn, user_id)
+        if user is None:
+            return None
+        for field in ('name', 'email', 'age', 'city'):
+            if field in changes:
+                user[field] = changes[field]
+        params = (user['name'], user['email'], user['age'], user['city'], user_id)
+        if 'email' in changes:
+            self._write_user(conn, self.UPDATE, params)
+        else:
+            conn.execute(self.UPDATE, params)
+        return user
+
+    def update(self, user_id, changes):
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                user = self._apply_update(conn, user_id, changes)
+                if user is not None:
+                    conn.execute(self.BUMP_VERSION)
+                return user
+        except sqlite3.IntegrityError:
+            raise EmailExistsError(changes.get('email'))
+
+    def delete(self, user_id):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            user = self._fetch(conn, user_id)
+            if user is not None:
+                conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+                conn.execute(self.BUMP_VERSION)
+        return user
+
+    def _lookup(self, sql, values):
+        """Run an IN (...) lookup in chunks, yielding result rows"""
+        conn = self._connection()
+        values = list(values)
+        for start in range(0, len(values), self.MAX_PARAMS):
+            chunk = values[start:start + self.MAX_PARAMS]
+            yield from conn.execute(sql.format(", ".join("?" * len(chunk))), chunk)
+
+    @timed('uniqueness_check')
+    def find_emails(self, emails):
+        return dict(self._lookup("SELECT email, id FROM users WHERE email IN ({})", emails))
+
+    def find_ids(self, user_ids):
+        return {row[0] for row in self._lookup("SELECT id FROM users WHERE id IN ({})", user_ids)}
+
+    def bulk_create(self, items):
+        conn = self._connection()
+        users = []
+        try:
+            with conn:
+                conn.execute(self.BUMP_VERSION)
+                for data in items:
+                    cursor = self._write_user(conn, self.INSERT, (data['name'], data['email'], data.get('age'),
+                                                                  data.get('city')))
+                    users.append({
+                        "id": cursor.lastrowid,
+                        "name": data['name'],
+                        "email": data['email'],
+                        "age": data.get('age'),
+                        "city": data.get('city')
+                    })
+        except sqlite3.IntegrityError:
+            raise EmailExistsError("Batch contains an email that is already in use")
+        return users
+
+    def bulk_update(self, items):
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute(self.BUMP_VERSION)
+                users = []
+                for changes in items:
+                    user = self._apply_update(conn, changes['id'], changes)
+                    if user is None:
+                        raise KeyError(changes['id'])
+                    users.append(user)
+        except sqlite3.IntegrityError:
+            raise EmailExistsError("Batch contains an email that is already in use")
+        return users
+
+    def bulk_delete(self, user_ids):
+        conn = self._connection()
+        with conn:
+            conn.execute(self.BUMP_VERSION)
+            users = []
+            for user_id in user_ids:
+                user = self._fetch(conn, user_id)
+                if user is None:
+                    raise KeyError(user_id)
+                conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+                users.append(user)
+        return users
+
+    def query(self, city=None, age_min=None, age_max=None, after_id=0, limit=None):
+        clauses, params = [], []
+        if city is not None:
+            clauses.append("city = ?")
+            params.append(city)
+        if age_min is not None:
+            clauses.append("age >= ?")
+            params.append(age_min)
+        if age_max is not None:
+            clauses.append("age <= ?")
+            params.append(age_max)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+
+        conn = self._connection()
+        total = conn.execute("SELECT COUNT(*) FROM users" + where, params).fetchone()[0]
+
+        clauses.append("id > ?")
+        sql = self.SELECT + " WHERE " + " AND ".join(clauses) + " ORDER BY id"
+        params.append(after_id)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return total, self._users(conn.execute(sql, params))
+
+    def close(self):
+        with self._pool_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def create_store(backend=None, path=None):
+    """
+    Build the store selected by the arguments or the USER_STORE / USER_DB
+    environment variables (defaults: in-memory).
+    """
+    backend = backend or os.environ.get('USER_STORE', 'memory')
+    if backend == 'memory':
+        return MemoryUserStore()
+    if backend == 'sqlite':
+        return SQLiteUserStore(path or os.environ.get('USER_DB', 'users.db'))
+    raise ValueError(f"Unknown storage backend: {backend}")
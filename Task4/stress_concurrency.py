@@ -0,0 +1,121 @@
+"""
+Concurrency stress test for the user store.
+
+Runs the app on a threaded local server and fires thousands of parallel
+requests at it: many clients racing to create users with overlapping emails,
+and concurrent updates that try to move users onto each other's emails.
+Afterwards it checks that every id handed out is unique, every email
+belongs to at most one user, and the store's indexes agree with its data.
+
+Usage: python stress_concurrency.py [--backends memory sqlite]
+                                    [--threads 64] [--requests 4000]
+Exits non-zero if any invariant is violated.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from loadtest import start_server
+from storage import MemoryUserStore, create_store
+
+HEADERS = {'Content-Type': 'application/json'}
+
+
+def request(port, method, path, payload=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        conn.request(method, path, body=json.dumps(payload) if payload is not None else None, headers=HEADERS)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or 'null')
+    finally:
+        conn.close()
+
+
+def race_creates(port, threads, total, email_pool):
+    """Many clients POST users whose emails collide on purpose"""
+    def create(i):
+        return request(port, 'POST', '/users', {"name": f"Racer {i}", "email": f"racer{i % email_pool}@example.com",
+                                                "age": 20 + i % 50, "city": f"City {i % 10}"})
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(create, range(total)))
+
+
+def race_updates(port, threads, total, user_ids):
+    """Concurrent PUTs trying to give different users the same new email"""
+    rng = random.Random(7)
+    jobs = [(rng.choice(user_ids), f"moved{rng.randint(0, total // 8)}@example.com") for _ in range(total)]
+
+    def update(job):
+        user_id, email = job
+        return request(port, 'PUT', f'/users/{user_id}', {"email": email, "age": rng.randint(18, 90)})
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(update, jobs))
+
+
+def check(backend, store, created, updated, email_pool):
+    failures = []
+    ids = [body['id'] for status, body in created if status == 201]
+    if len(ids) != len(set(ids)):
+        failures.append(f"duplicate ids handed out: {[i for i, n in Counter(ids).items() if n > 1][:5]}")
+    if len(ids) != email_pool:
+        failures.append(f"expected {email_pool} successful creates, got {len(ids)}")
+    unexpected = {status for status, _ in created + updated} - {200, 201, 400}
+    if unexpected:
+        failures.append(f"unexpected status codes: {sorted(unexpected)}")
+
+    users = store.all()
+    emails = Counter(user['email'] for user in users.values())
+    shared = [email for email, n in emails.items() if n > 1]
+    if shared:
+        failures.append(f"emails shared by several users: {shared[:5]}")
+
+    if isinstance(store, MemoryUserStore):
+        expected_index = {user['email']: user_id for user_id, user in users.items()}
+        if store.email_index != expected_index:
+            failures.append("email index out of sync with stored users")
+        if store.user_ids != sorted(users):
+            failures.append("id list out of sync with stored users")
+        for city, city_ids in store.city_index.items():
+            if city_ids != sorted(city_ids) or any(users[uid]['city'] != city for uid in city_ids):
+                failures.append(f"city index out of sync for {city}")
+                break
+
+    print(f"{backend:<8} creates ok={len(ids)} updates ok={sum(1 for s, _ in updated if s == 200)} "
+          f"users={len(users)} -> {'PASS' if not failures else 'FAIL'}")
+    for failure in failures:
+        print(f"  - {failure}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency stress test for the user store")
+    parser.add_argument('--backends', nargs='+', default=['memory', 'sqlite'])
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=4000)
+    args = parser.parse_args()
+
+    # Switch threads as often as possible to shake out check-then-act races
+    sys.setswitchinterval(1e-6)
+    email_pool = args.requests // 4
+    passed = True
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = create_store(backend, os.path.join(tmp, 'stress.db'))
+            server = start_server(store)
+            created = race_creates(server.server_port, args.threads, args.requests, email_pool)
+            user_ids = [body['id'] for status, body in created if status == 201]
+            updated = race_updates(server.server_port, args.threads, args.requests, user_ids)
+            server.shutdown()
+            passed &= check(backend, store, created, updated, email_pool)
+            store.close()
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Tests for the Flask app's bulk endpoints on the in-memory store.
+
+Run with: python -m unittest test_app  (from Task4/)
+"""
+import unittest
+
+import app
+from storage import MemoryUserStore
+
+
+class BulkEndpointTest(unittest.TestCase):
+
+    def setUp(self):
+        app.store = MemoryUserStore()
+        app.response_cache.clear()
+        self.client = app.app.test_client()
+        for name in ("one", "two"):
+            self.client.post('/users', json={"name": name, "email": f"{name}@example.com"})
+
+    def test_bulk_delete_rejects_boolean_ids(self):
+        response = self.client.delete('/users/bulk', json=[True])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['results'][0]['error'], "Each item needs an integer id")
+        response = self.client.delete('/users/bulk', json=[{"id": True}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(app.store.count(), 2)
+
+    def test_bulk_update_rejects_boolean_ids(self):
+        response = self.client.patch('/users/bulk', json=[{"id": True, "name": "changed"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['results'][0]['error'], "Each item needs an integer id")
+        self.assertEqual(app.store.get(1)['name'], "one")
+
+    def test_rejected_creates_use_no_id(self):
+        response = self.client.post('/users', json={"name": "dup", "email": "one@example.com"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/users/bulk', json=[{"name": "three", "email": "three@example.com"},
+                                                         {"name": "dup", "email": "three@example.com"}])
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/users', json={"name": "three", "email": "three@example.com"})
+        self.assertEqual(response.get_json()['id'], 3)
+
+    def test_bulk_delete_accepts_integer_ids(self):
+        response = self.client.delete('/users/bulk', json=[1, {"id": 2}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(app.store.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
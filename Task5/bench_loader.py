@@ -0,0 +1,100 @@
+"""
+Load-time and memory benchmark for sales_loader on a scaled sales_data.csv.
+
+Writes sales_data.csv repeated --scale times to a temporary file, then
+loads it in a fresh subprocess per method so peak RSS is not shared:
+
+  baseline  pd.read_csv with default dtypes, then pd.to_datetime (the notebook)
+  typed-c   load_sales with the C parser
+  pyarrow   load_sales with the pyarrow parser
+  chunked   iter_sales, summing Total_Sales chunk by chunk (never holds the file)
+
+Usage: python bench_loader.py [--scale 100] [--chunksize 1000000]
+Needs a Unix-like OS (peak RSS comes from the resource module).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+METHODS = ('baseline', 'typed-c', 'pyarrow', 'chunked')
+
+
+def scale_csv(source, target, scale):
+    with open(source, 'rb') as file:
+        header = file.readline()
+        body = file.read()
+    if not body.endswith(b'\n'):
+        body += b'\n'
+    with open(target, 'wb') as file:
+        file.write(header)
+        for _ in range(scale):
+            file.write(body)
+
+
+def measure(method, path, chunksize):
+    """Subprocess entry point: load once and print the numbers as JSON"""
+    import resource
+    import pandas as pd
+    from sales_loader import iter_sales, load_sales
+
+    start = time.perf_counter()
+    if method == 'baseline':
+        df = pd.read_csv(path)
+        df['Date'] = pd.to_datetime(df['Date'])
+    elif method == 'typed-c':
+        df = load_sales(path, engine='c')
+    elif method == 'pyarrow':
+        df = load_sales(path, engine='pyarrow')
+    else:
+        rows = 0
+        total = 0.0
+        for chunk in iter_sales(path, chunksize):
+            rows += len(chunk)
+            total += chunk['Total_Sales'].sum()
+        df = None
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({
+        'seconds': elapsed,
+        'rows': len(df) if df is not None else rows,
+        'frame_bytes': int(df.memory_usage(deep=True).sum()) if df is not None else None,
+        'peak_rss': peak,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--methods', nargs='+', choices=METHODS, default=list(METHODS))
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.path, args.chunksize)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales_scaled.csv')
+        scale_csv(os.path.join(HERE, 'sales_data.csv'), path, args.scale)
+        print(f"sales_data.csv x{args.scale}: {os.path.getsize(path) / 2**20:.0f} MB")
+        print(f"{'method':<10} {'rows':>10} {'load s':>8} {'frame MB':>9} {'peak RSS MB':>12}")
+        for method in args.methods:
+            result = subprocess.run([sys.executable, __file__, '--measure', method, '--path', path,
+                                     '--chunksize', str(args.chunksize)],
+                                    cwd=HERE, capture_output=True, text=True, check=True)
+            numbers = json.loads(result.stdout.strip().splitlines()[-1])
+            frame = f"{numbers['frame_bytes'] / 2**20:.0f}" if numbers['frame_bytes'] is not None else '-'
+            print(f"{method:<10} {numbers['rows']:>10} {numbers['seconds']:>8.2f} {frame:>9} "
+                  f"{numbers['peak_rss'] / 2**20:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Report-time benchmark for sales_aggregates on a scaled sales_data.csv.
+
+Loads sales_data.csv repeated --scale times with load_sales, adds the
+notebook's date features, then times the numbers behind every plot, KPI,
+insight and CSV export of sales_data_analysis.ipynb computed two ways:
+
+  groupby     a fresh groupby over the rows for each one (the notebook before
+              SalesAggregates)
+  aggregates  SalesAggregates.from_frame once, every number read from it
+
+and, from the file, SalesAggregates.from_chunks(iter_sales(...)), which
+never holds the whole dataset. The exported tables of all three are checked
+to agree.
+
+Usage: python bench_report.py [--scale 200] [--repeat 3] [--chunksize 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_loader import scale_csv
+from sales_aggregates import DAYS, SalesAggregates
+from sales_loader import iter_sales, load_sales
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def groupby_report(df):
+    """The notebook's groupbys, one per use"""
+    report = {
+        'monthly_sales': df.groupby('Month')['Total_Sales'].sum(),
+        'region_sales': df.groupby('Region', observed=True)['Total_Sales'].sum().sort_values(ascending=False),
+        'channel_sales': df.groupby('Sales_Channel', observed=True)['Total_Sales'].sum(),
+        'daily_sales': df.groupby('DayOfWeek')['Total_Sales'].sum().reindex(DAYS),
+        'product_sales': df.groupby('Product', observed=True)['Total_Sales'].sum().sort_values(ascending=False),
+        'product_quantity': df.groupby('Product', observed=True)['Quantity'].sum().sort_values(ascending=False),
+        'avg_price': df.groupby('Product', observed=True)['Unit_Price'].mean().sort_values(ascending=False),
+        'product_scatter': df.groupby('Product', observed=True).agg({'Total_Sales': 'sum', 'Quantity': 'sum'}),
+        'region_channel': df.groupby(['Region', 'Sales_Channel'], observed=True)['Total_Sales'].sum().unstack(),
+        'monthly_growth': df.groupby('Month')['Total_Sales'].sum().pct_change() * 100,
+        'region_product': df.groupby(['Region', 'Product'], observed=True)['Total_Sales'].sum(),
+        'top_customers': df.groupby('Customer_ID', observed=True)['Total_Sales'].sum()
+                           .sort_values(ascending=False).head(10),
+        'weekly_sales': df.groupby('WeekNumber')['Total_Sales'].sum(),
+        'kpis': (df['Total_Sales'].sum(), df['Total_Sales'].mean(), len(df), df['Customer_ID'].nunique(),
+                 df['Quantity'].mean()),
+        'monthly_kpis': df.groupby('Month').agg({'Total_Sales': ['sum', 'mean'], 'Customer_ID': 'nunique',
+                                                 'Quantity': 'sum'}).round(2),
+        'daily_sales_ts': df.groupby('Date')['Total_Sales'].sum(),
+        'best': (df.groupby('Month')['Total_Sales'].sum().idxmax(),
+                 df.groupby('Region', observed=True)['Total_Sales'].sum().idxmax(),
+                 df.groupby('Product', observed=True)['Total_Sales'].sum().idxmax(),
+                 df.groupby('Sales_Channel', observed=True)['Total_Sales'].sum().idxmax()),
+        'quarters': (df[df['Quarter'] == 1]['Total_Sales'].sum(), df[df['Quarter'] == 4]['Total_Sales'].sum()),
+        'customer_value': df.groupby('Customer_ID', observed=True)['Total_Sales'].sum().mean(),
+        'popular_day': df['DayOfWeek'].mode()[0],
+    }
+    products = df.groupby('Product', observed=True).agg({'Total_Sales': ['sum', 'count'], 'Quantity': 'sum',
+                                                         'Unit_Price': 'mean'}).round(2)
+    products.columns = ['Total_Revenue', 'Transaction_Count', 'Total_Quantity', 'Avg_Unit_Price']
+    report['product_performance'] = products.sort_values('Total_Revenue', ascending=False)
+    regions = df.groupby('Region', observed=True).agg({'Total_Sales': 'sum', 'Customer_ID': 'nunique',
+                                                       'Quantity': 'sum'}).round(2)
+    regions.columns = ['Total_Revenue', 'Unique_Customers', 'Total_Quantity']
+    report['regional_performance'] = regions
+    return report
+
+
+def aggregates_report(aggregates):
+    """The same numbers read from one SalesAggregates"""
+    totals = aggregates.totals
+    months = aggregates.rollup('Month')
+    regions = aggregates.rollup('Region')
+    channels = aggregates.rollup('Sales_Channel')
+    products = aggregates.rollup('Product')
+    quarters = aggregates.rollup('Quarter')['Total_Sales']
+    report = {
+        'monthly_sales': months['Total_Sales'],
+        'region_sales': regions['Total_Sales'].sort_values(ascending=False),
+        'channel_sales': channels['Total_Sales'],
+        'daily_sales': aggregates.by_day_of_week['Total_Sales'],
+        'product_sales': products['Total_Sales'].sort_values(ascending=False),
+        'product_quantity': products['Quantity'].sort_values(ascending=False),
+        'avg_price': products['Avg_Unit_Price'].sort_values(ascending=False),
+        'product_scatter': products[['Total_Sales', 'Quantity']],
+        'region_channel': aggregates.rollup('Region', 'Sales_Channel')['Total_Sales'].unstack(),
+        'monthly_growth': months['Total_Sales'].pct_change() * 100,
+        'region_product': aggregates.rollup('Region', 'Product')['Total_Sales'],
+        'top_customers': aggregates.by_customer['Total_Sales'].sort_values(ascending=False).head(10),
+        'weekly_sales': aggregates.rollup('WeekNumber')['Total_Sales'],
+        'kpis': (totals['Total_Sales'], totals['Avg_Order_Value'], totals['Transactions'],
+                 totals['Unique_Customers'], totals['Avg_Quantity']),
+        'monthly_kpis': months[['Total_Sales', 'Avg_Order_Value', 'Unique_Customers', 'Quantity']].round(2),
+        'daily_sales_ts': aggregates.rollup('Date')['Total_Sales'],
+        'best': (months['Total_Sales'].idxmax(), regions['Total_Sales'].idxmax(),
+                 products['Total_Sales'].idxmax(), channels['Total_Sales'].idxmax()),
+        'quarters': (quarters[1], quarters[4]),
+        'customer_value': aggregates.by_customer['Total_Sales'].mean(),
+        'popular_day': aggregates.by_day_of_week['Transactions'].idxmax(),
+    }
+    product_table = products[['Total_Sales', 'Transactions', 'Quantity', 'Avg_Unit_Price']].round(2)
+    product_table.columns = ['Total_Revenue', 'Transaction_Count', 'Total_Quantity', 'Avg_Unit_Price']
+    report['product_performance'] = product_table.sort_values('Total_Revenue', ascending=False)
+    region_table = regions[['Total_Sales', 'Unique_Customers', 'Quantity']].round(2)
+    region_table.columns = ['Total_Revenue', 'Unique_Customers', 'Total_Quantity']
+    report['regional_performance'] = region_table
+    return report
+
+
+def check(expected, actual, name):
+    for table in ('product_performance', 'regional_performance', 'monthly_kpis'):
+        assert (expected[table].index == actual[table].index).all(), (name, table)
+        assert np.allclose(expected[table].to_numpy(dtype='float64'), actual[table].to_numpy(dtype='float64'),
+                           rtol=1e-9), (name, table)
+    assert expected['best'] == actual['best'], name
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales_scaled.csv')
+        scale_csv(os.path.join(HERE, 'sales_data.csv'), path, args.scale)
+        df = load_sales(path)
+        df['Month'] = df['Date'].dt.month
+        df['Quarter'] = df['Date'].dt.quarter
+        df['DayOfWeek'] = df['Date'].dt.day_name()
+        df['WeekNumber'] = df['Date'].dt.isocalendar().week
+        print(f"sales_data.csv x{args.scale}: {len(df):,} rows")
+
+        baseline, expected = best_of(args.repeat, lambda: groupby_report(df))
+        single, actual = best_of(args.repeat, lambda: aggregates_report(SalesAggregates.from_frame(df)))
+        check(expected, actual, 'aggregates')
+        del df
+        chunked, actual = best_of(args.repeat, lambda: aggregates_report(
+            SalesAggregates.from_chunks(iter_sales(path, args.chunksize))))
+        check(expected, actual, 'chunked')
+
+    print(f"{'method':<22} {'report s':>9} {'speedup':>8}")
+    print(f"{'groupby':<22} {baseline:>9.2f} {1:>7.1f}x")
+    print(f"{'aggregates':<22} {single:>9.2f} {baseline / single:>7.1f}x")
+    # Includes reading the CSV, which the other two do before the clock starts
+    print(f"{'chunked (incl. read)':<22} {chunked:>9.2f} {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+One-pass aggregation of sales data for the analysis report.
+
+SalesAggregates reads the rows once and keeps two small tables:
+
+  cube       sums of Total_Sales, Quantity and Unit_Price and a transaction
+             count per (Date, Product, Region, Sales_Channel), with Month,
+             Quarter, DayOfWeek and WeekNumber derived from each date
+  customers  Total_Sales and transaction count per (Customer_ID, Month, Region)
+
+Every rollup the report needs (by product, region, channel, month, quarter,
+day of week, week, date or customer, with totals, counts, means and unique
+customers) is grouped from those tables on first use and cached. The plots,
+KPIs, insights and CSV exports then share one result instead of grouping
+the full data again each time.
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+CUBE_KEYS = ['Date', 'Product', 'Region', 'Sales_Channel']
+CUBE_SUMS = ['Total_Sales', 'Quantity', 'Unit_Price']
+CUSTOMER_KEYS = ['Customer_ID', 'Month', 'Region']
+CUSTOMER_SUMS = ['Total_Sales']
+DATE_KEYS = ['Month', 'Quarter', 'DayOfWeek', 'WeekNumber']
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _factorize(values):
+    """(integer code per row, sorted distinct values); -1 marks a missing value"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values, sort=True)
+
+
+def _aggregate(keys, sums, count=None):
+    """
+    Sum each Series in `sums` (name -> Series) per distinct combination of
+    the keys (name -> (codes, values) as from _factorize), and count rows into
+    a `count` column if given.
+
+    The key codes are combined into one integer code per row and the sums are
+    taken with np.bincount over it, a few times faster than a multi-key
+    groupby on millions of rows. Rows with a missing key are dropped, as
+    groupby does, and combinations that never occur are left out.
+    """
+    codes, levels = zip(*keys.values())
+    valid = np.logical_and.reduce([code >= 0 for code in codes])
+    if not valid.all():
+        codes = [code[valid] for code in codes]
+    shape = [max(len(level), 1) for level in levels]
+    combined = np.ravel_multi_index(codes, shape)
+    dense = np.prod(shape, dtype='float64') <= len(combined)
+    if dense:
+        # Few enough combinations to index bincount by the combined code itself
+        groups, size = combined, int(np.prod(shape))
+    else:
+        groups, combined_values = pd.factorize(combined)
+        size = len(combined_values)
+    counts = np.bincount(groups, minlength=size)
+    occurring = np.flatnonzero(counts)
+
+    combined_values = occurring if dense else combined_values[occurring]
+    positions = np.unravel_index(combined_values, shape)
+    result = pd.DataFrame({name: level.take(position)
+                           for name, level, position in zip(keys, levels, positions)})
+    for name, values in sums.items():
+        weights = values.to_numpy(dtype='float64')
+        totals = np.bincount(groups, weights=weights if valid.all() else weights[valid], minlength=size)[occurring]
+        result[name] = totals.astype('int64') if pd.api.types.is_integer_dtype(values) else totals
+    if count:
+        result[count] = counts[occurring]
+    return result
+
+
+class SalesAggregates:
+    """
+    Cached rollups of one sales dataset, built from a single pass over its rows
+    """
+
+    def __init__(self, cube, customers):
+        dates = cube['Date'].dt
+        self.cube = cube.assign(Month=dates.month, Quarter=dates.quarter, DayOfWeek=dates.day_name(),
+                                WeekNumber=dates.isocalendar().week)
+        self.customers = customers
+        self._rollups = {}
+
+    @staticmethod
+    def _tables(df):
+        keys = {key: _factorize(df[key]) for key in CUBE_KEYS + ['Customer_ID']}
+        # Month per row from the few distinct dates rather than from every row
+        day_codes, dates = keys['Date']
+        month_codes = np.where(day_codes >= 0, dates.month.to_numpy()[day_codes] - 1, -1)
+        keys['Month'] = month_codes, pd.Index(range(1, 13), name='Month')
+        cube = _aggregate({key: keys[key] for key in CUBE_KEYS},
+                          {column: df[column] for column in CUBE_SUMS}, count='Transactions')
+        customers = _aggregate({key: keys[key] for key in CUSTOMER_KEYS},
+                               {column: df[column] for column in CUSTOMER_SUMS}, count='Transactions')
+        return cube, customers
+
+    @classmethod
+    def from_frame(cls, df):
+        """Aggregate a DataFrame with the sales_data.csv columns"""
+        return cls(*cls._tables(df))
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """
+        Aggregate DataFrames one at a time (e.g. sales_loader.iter_sales), so
+        only one chunk and the partial tables are in memory at once
+        """
+        cubes, customer_tables = [], []
+        for chunk in chunks:
+            cube, customers = cls._tables(chunk)
+            cubes.append(cube)
+            customer_tables.append(customers)
+        if not cubes:
+            raise ValueError("no chunks to aggregate")
+        if len(cubes) == 1:
+            return cls(cubes[0], customer_tables[0])
+        cube = pd.concat(cubes, ignore_index=True)
+        customers = pd.concat(customer_tables, ignore_index=True)
+        return cls(_aggregate({key: _factorize(cube[key]) for key in CUBE_KEYS},
+                              {column: cube[column] for column in CUBE_SUMS + ['Transactions']}),
+                   _aggregate({key: _factorize(customers[key]) for key in CUSTOMER_KEYS},
+                              {column: customers[column] for column in CUSTOMER_SUMS + ['Transactions']}))
+
+    def rollup(self, *keys):
+        """
+        Total_Sales, Quantity, Transactions, Avg_Order_Value, Avg_Quantity and
+        Avg_Unit_Price per distinct value of `keys`, sorted by key. Keys are
+        Date, Product, Region, Sales_Channel, Month, Quarter, DayOfWeek or
+        WeekNumber. Unique_Customers is added when the keys are drawn from
+        Month and Region. With no keys, returns the overall totals as a Series.
+        """
+        if keys not in self._rollups:
+            unknown = set(keys) - set(CUBE_KEYS + DATE_KEYS)
+            if unknown:
+                raise KeyError(f"cannot roll up by {', '.join(sorted(unknown))}")
+            columns = CUBE_SUMS + ['Transactions']
+            if keys:
+                table = self.cube.groupby(list(keys), observed=True)[columns].sum()
+            else:
+                table = self.cube[columns].sum()
+            table['Avg_Order_Value'] = table['Total_Sales'] / table['Transactions']
+            table['Avg_Quantity'] = table['Quantity'] / table['Transactions']
+            table['Avg_Unit_Price'] = table['Unit_Price'] / table['Transactions']
+            if set(keys) <= {'Month', 'Region'}:
+                if keys:
+                    table['Unique_Customers'] = self.customers.groupby(list(keys), observed=True)['Customer_ID'].nunique()
+                else:
+                    table['Unique_Customers'] = self.customers['Customer_ID'].nunique()
+            self._rollups[keys] = table.drop(columns='Unit_Price') if keys else table.drop('Unit_Price')
+        return self._rollups[keys]
+
+    @property
+    def totals(self):
+        """The rollup with no keys: overall totals, means and unique customers"""
+        return self.rollup()
+
+    @property
+    def by_day_of_week(self):
+        """The DayOfWeek rollup in calendar order, Monday first"""
+        return self.rollup('DayOfWeek').reindex(DAYS)
+
+    @cached_property
+    def by_customer(self):
+        """Total_Sales and Transactions per Customer_ID"""
+        return self.customers.groupby('Customer_ID', observed=True)[CUSTOMER_SUMS + ['Transactions']].sum()
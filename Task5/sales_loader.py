@@ -0,0 +1,90 @@
+"""
+Typed loading of sales exports (Date, Product, Region, Sales_Channel,
+Quantity, Unit_Price, Total_Sales, Customer_ID).
+
+Dates are parsed while the CSV is read instead of in a second pass, and the
+repeating text columns are loaded as `category`, which stores each distinct
+value once and a small integer code per row. `load_sales` returns the
+whole file as one DataFrame, read by pyarrow's multi-threaded CSV reader
+when it is installed. `iter_sales` yields it in chunks of typed rows for
+exports too large for memory.
+"""
+import pandas as pd
+
+CATEGORY_COLUMNS = ['Product', 'Region', 'Sales_Channel', 'Customer_ID']
+DTYPES = {
+    **{column: 'category' for column in CATEGORY_COLUMNS},
+    'Quantity': 'int32',
+    'Unit_Price': 'float64',
+    'Total_Sales': 'float64',
+}
+DATE_COLUMNS = ['Date']
+DATE_FORMAT = '%Y-%m-%d'
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    DEFAULT_ENGINE = 'pyarrow'
+except ImportError:
+    pa = None
+    DEFAULT_ENGINE = 'c'
+
+
+def _read_options(usecols=None):
+    dtypes = DTYPES if usecols is None else {column: dtype for column, dtype in DTYPES.items() if column in usecols}
+    dates = DATE_COLUMNS if usecols is None else [column for column in DATE_COLUMNS if column in usecols]
+    return {'dtype': dtypes, 'parse_dates': dates, 'date_format': DATE_FORMAT, 'usecols': usecols}
+
+
+def _load_pyarrow(path, usecols=None):
+    # pandas' engine='pyarrow' converts dtypes after the read, which costs more
+    # than the read itself; asking pyarrow for the final types avoids that
+    column_types = {column: pa.dictionary(pa.int32(), pa.string()) for column in CATEGORY_COLUMNS}
+    column_types.update({'Quantity': pa.int32(), 'Unit_Price': pa.float64(), 'Total_Sales': pa.float64()})
+    column_types.update({column: pa.timestamp('ns') for column in DATE_COLUMNS})
+    options = pa_csv.ConvertOptions(column_types=column_types, include_columns=usecols)
+    df = pa_csv.read_csv(path, convert_options=options).to_pandas()
+    # Dictionaries come in order of first appearance; sort them like read_csv does
+    for column in CATEGORY_COLUMNS:
+        if column in df:
+            df[column] = df[column].cat.reorder_categories(df[column].cat.categories.sort_values())
+    return df
+
+
+def load_sales(path, engine=None, usecols=None):
+    """
+    Read a sales CSV into one DataFrame with typed columns.
+
+    engine: 'pyarrow' (the default when pyarrow is installed), 'c' or
+    'python'. usecols limits the read to those columns.
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine == 'pyarrow':
+        if pa is None:
+            raise ImportError("engine='pyarrow' needs the pyarrow package")
+        return _load_pyarrow(path, usecols)
+    return pd.read_csv(path, engine=engine, **_read_options(usecols))
+
+
+def iter_sales(path, chunksize=1_000_000, usecols=None):
+    """
+    Yield a sales CSV as typed DataFrames of at most `chunksize` rows, so
+    only one chunk is in memory at a time. Category codes are per chunk;
+    combine chunks with `concat_sales` to keep the category dtypes.
+    """
+    with pd.read_csv(path, chunksize=chunksize, engine='c', **_read_options(usecols)) as reader:
+        yield from reader
+
+
+def concat_sales(chunks):
+    """Concatenate chunks from iter_sales, unioning their categories so the columns stay categorical"""
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame(columns=list(DATE_COLUMNS) + list(DTYPES))
+    for column in CATEGORY_COLUMNS:
+        if column in chunks[0]:
+            categories = pd.api.types.union_categoricals([chunk[column] for chunk in chunks],
+                                                         sort_categories=True).categories
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)